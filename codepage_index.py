@@ -0,0 +1,135 @@
+# codepage_index.py — which ESC/POS codepages can print which characters
+
+# ESC/POS codepage candidates, in order of preference: (ESC t n, codec, description)
+CODEPAGE_CANDIDATES = [
+    (16, "cp1252", "Western Europe + €"),
+    (2, "cp850", "Western Europe"),
+    (18, "cp852", "Polish / Central Europe"),
+    (5, "cp865", "Nordic"),
+    (17, "cp866", "Cyrillic / Russian"),
+    (0, "cp437", "Box-drawing / Graphics"),
+]
+
+ALL_CODEPAGES = (1 << len(CODEPAGE_CANDIDATES)) - 1
+
+
+def _build_index():
+    """
+    Map every character to a bitmask of the candidates that can encode it.
+    Bit i is set when CODEPAGE_CANDIDATES[i] has the character. All candidates
+    are single-byte codecs, so decoding 0..255 enumerates them completely.
+    """
+    index = {}
+    for bit, (_, codec, _) in enumerate(CODEPAGE_CANDIDATES):
+        for b in range(256):
+            try:
+                ch = bytes([b]).decode(codec)
+            except UnicodeDecodeError:
+                continue
+            index[ch] = index.get(ch, 0) | (1 << bit)
+    return index
+
+
+CHAR_INDEX = _build_index()
+
+
+def char_mask(ch):
+    return CHAR_INDEX.get(ch, 0)
+
+
+def text_mask(text):
+    """
+    Bitmask of the candidates that can encode all of text.
+    """
+    mask = ALL_CODEPAGES
+    index = CHAR_INDEX
+    for ch in text:
+        mask &= index.get(ch, 0)
+        if not mask:
+            break
+    return mask
+
+
+def first_codepage(mask):
+    """
+    Preferred candidate in mask as (n, codec, desc), or (None, None, None).
+    """
+    if not mask:
+        return None, None, None
+    bit = (mask & -mask).bit_length() - 1
+    return CODEPAGE_CANDIDATES[bit]
+
+
+def find_codepage(text):
+    return first_codepage(text_mask(text))
+
+
+def split_runs(text, current=None, replacement="?"):
+    """
+    Split text into [(n, codec, run), ...] so that every run is encodable in
+    its codepage and the number of codepage switches is minimal.
+
+    current is the ESC t value already active on the printer (or None);
+    staying in it costs nothing. Characters no candidate covers are replaced
+    with replacement. Ties go to the preferred (earlier) candidate.
+    """
+    if not text:
+        return []
+
+    count = len(CODEPAGE_CANDIDATES)
+    chars = []
+    masks = []
+    for ch in text:
+        m = CHAR_INDEX.get(ch, 0)
+        if not m:
+            ch, m = replacement, CHAR_INDEX.get(replacement, ALL_CODEPAGES)
+        chars.append(ch)
+        masks.append(m)
+
+    # Whole line in one codepage: avoid the DP entirely
+    mask = ALL_CODEPAGES
+    for m in masks:
+        mask &= m
+    if mask:
+        bits = [b for b in range(count) if CODEPAGE_CANDIDATES[b][0] == current and mask >> b & 1]
+        n, codec, _ = CODEPAGE_CANDIDATES[bits[0]] if bits else first_codepage(mask)
+        return [(n, codec, "".join(chars))]
+
+    INF = len(chars) + 2
+    cost = [0 if n == current else 1 for n, _, _ in CODEPAGE_CANDIDATES]
+    # back[i][k]: codepage used for char i-1 when char i is printed in k
+    back = []
+
+    for i, m in enumerate(masks):
+        best = min(range(count), key=lambda k: cost[k])
+        new_cost = [INF] * count
+        came_from = [None] * count
+        for k in range(count):
+            if not m >> k & 1:
+                continue
+            if i == 0:
+                new_cost[k] = cost[k]
+            elif cost[k] <= cost[best] + 1:
+                new_cost[k] = cost[k]
+                came_from[k] = k
+            else:
+                new_cost[k] = cost[best] + 1
+                came_from[k] = best
+        back.append(came_from)
+        cost = new_cost
+
+    k = min(range(count), key=lambda k: cost[k])
+    path = [k]
+    for i in range(len(chars) - 1, 0, -1):
+        k = back[i][k]
+        path.append(k)
+    path.reverse()
+
+    runs = []
+    start = 0
+    for i in range(1, len(chars) + 1):
+        if i == len(chars) or path[i] != path[start]:
+            n, codec, _ = CODEPAGE_CANDIDATES[path[start]]
+            runs.append((n, codec, "".join(chars[start:i])))
+            start = i
+    return runs
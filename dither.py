@@ -0,0 +1,180 @@
+# dither.py — grayscale -> 1-bit conversion engines
+#
+# "pil" and "threshold" only need PIL. The others are vectorized with NumPy,
+# which is imported lazily so plain image printing does not require it.
+
+from PIL import Image
+
+DEFAULT_ALGORITHM = "pil"
+DEFAULT_THRESHOLD = 80
+
+ALGORITHMS = (
+    "pil",              # PIL's built-in Floyd-Steinberg (C, fastest FS)
+    "threshold",        # fixed threshold
+    "otsu",             # threshold picked from the histogram
+    "bayer4",           # ordered 4x4
+    "bayer8",           # ordered 8x8
+    "floyd-steinberg",  # error diffusion, NumPy wavefront
+    "atkinson",         # error diffusion, NumPy wavefront
+)
+
+ERROR_DIFFUSION = ("floyd-steinberg", "atkinson")
+
+# divisor, [(dy, dx, weight)] of the error pushed to not-yet-processed neighbours
+_KERNELS = {
+    "floyd-steinberg": (16, [(0, 1, 7), (1, -1, 3), (1, 0, 5), (1, 1, 1)]),
+    "atkinson": (8, [(0, 1, 1), (0, 2, 1), (1, -1, 1), (1, 0, 1), (1, 1, 1), (2, 0, 1)]),
+}
+
+# error diffusion works in fixed point, 1/ERROR_UNIT of a gray level
+ERROR_UNIT = 256
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("This dithering algorithm requires numpy (pip install numpy)")
+    return numpy
+
+
+def _from_black(black):
+    """
+    Boolean array (True = black) -> PIL mode "1" image.
+    """
+    np = _numpy()
+    h, w = black.shape
+    packed = np.packbits(~black, axis=1)  # PIL "1": set bit = white
+    return Image.frombytes("1", (w, h), packed.tobytes())
+
+
+# ---------------------------
+# Thresholds
+# ---------------------------
+
+def otsu_threshold(histogram):
+    """
+    Level maximizing between-class variance for a 256-bin histogram.
+    """
+    np = _numpy()
+    hist = np.asarray(histogram[:256], dtype=np.float64)
+    total = hist.sum()
+    if not total:
+        return DEFAULT_THRESHOLD
+    levels = np.arange(256)
+    w0 = np.cumsum(hist)
+    w1 = total - w0
+    m0 = np.cumsum(hist * levels)
+    mean_total = m0[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean_total * w0 - m0 * total) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = -1
+    # pixels <= t are one class; "black when < threshold" wants t + 1
+    return int(np.argmax(between)) + 1
+
+
+def _bayer(n):
+    np = _numpy()
+    m = np.array([[0, 2], [3, 1]])
+    while m.shape[0] < n:
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return (m + 0.5) * (256.0 / (n * n))
+
+
+def ordered(gray, n, y_offset=0):
+    np = _numpy()
+    a = np.asarray(gray, dtype=np.uint8)
+    h, w = a.shape
+    m = _bayer(n)
+    rows = (np.arange(h) + y_offset) % n
+    cols = np.arange(w) % n
+    return _from_black(a < m[rows[:, None], cols[None, :]])
+
+
+# ---------------------------
+# Error diffusion
+# ---------------------------
+
+class ErrorDiffuser:
+    """
+    Floyd-Steinberg / Atkinson error diffusion, vectorized over wavefronts.
+
+    Pixel (y, x) only depends on pixels with a smaller x + 2*y, so every
+    anti-diagonal x + 2*y = t is processed as one NumPy operation. The
+    error pushed below the last row is kept as carry and added to the next
+    call, so an image fed in bands dithers exactly like the whole image.
+    Errors are integers (fixed point) for that: float sums would depend on
+    the order the contributions arrive in, which banding changes.
+    """
+
+    def __init__(self, algorithm="floyd-steinberg", threshold=128):
+        if algorithm not in _KERNELS:
+            raise ValueError(f"Not an error diffusion algorithm: {algorithm}")
+        self.divisor, self.kernel = _KERNELS[algorithm]
+        self.threshold = threshold
+        self.depth = max(dy for dy, _, _ in self.kernel)
+        self.carry = None
+
+    def process(self, gray):
+        np = _numpy()
+        a = np.asarray(gray, dtype=np.int32) * ERROR_UNIT
+        h, w = a.shape
+        threshold = self.threshold * ERROR_UNIT
+        white = 255 * ERROR_UNIT
+        half = self.divisor // 2
+
+        # 2 columns of padding each side and depth rows below swallow the
+        # error that falls off the image edges
+        buf = np.zeros((h + self.depth, w + 4), dtype=np.int32)
+        buf[:h, 2:w + 2] = a
+        if self.carry is not None and self.carry.shape[1] == w + 4:
+            buf[:self.depth] += self.carry
+
+        black = np.zeros((h, w), dtype=bool)
+
+        for t in range(w + 2 * (h - 1)):
+            y_lo = max(0, (t - w + 2) // 2)
+            y_hi = min(h - 1, t // 2)
+            if y_lo > y_hi:
+                continue
+            ys = np.arange(y_lo, y_hi + 1)
+            xs = t - 2 * ys + 2
+
+            v = buf[ys, xs]
+            is_black = v < threshold
+            black[ys, xs - 2] = is_black
+            err = v - np.where(is_black, 0, white)
+
+            for dy, dx, wgt in self.kernel:
+                buf[ys + dy, xs + dx] += (err * wgt + half) // self.divisor
+
+        carry = buf[h:h + self.depth].copy()
+        carry[:, :2] = 0
+        carry[:, w + 2:] = 0
+        self.carry = carry
+        return _from_black(black)
+
+
+# ---------------------------
+# Entry point
+# ---------------------------
+
+def to_1bit(gray, algorithm=DEFAULT_ALGORITHM, threshold=DEFAULT_THRESHOLD):
+    """
+    Convert a mode "L" image to mode "1" with the selected algorithm.
+    threshold is used by "threshold" only.
+    """
+    if algorithm == "pil":
+        return gray.convert("1")
+    if algorithm == "threshold":
+        return gray.point(lambda x: 0 if x < threshold else 255, '1')
+    if algorithm == "otsu":
+        t = otsu_threshold(gray.histogram())
+        return gray.point(lambda x: 0 if x < t else 255, '1')
+    if algorithm == "bayer4":
+        return ordered(gray, 4)
+    if algorithm == "bayer8":
+        return ordered(gray, 8)
+    if algorithm in ERROR_DIFFUSION:
+        return ErrorDiffuser(algorithm).process(gray)
+    raise ValueError(f"Unknown dithering algorithm: {algorithm} (choose from {', '.join(ALGORITHMS)})")
@@ -0,0 +1,236 @@
+# job_metrics.py — per-job stage timings and Prometheus-style histograms
+#
+# print.core_print() opens a job; code on the print path marks its stages:
+#
+#   with job_metrics.stage("rasterize"):
+#       raster = pil_to_escpos_raster(img)
+#
+# Stage times are exclusive: a stage nested inside another (e.g. a USB write
+# during markdown rendering) is subtracted from the outer one. Stages run in
+# helper threads (banded images, image tiles) overlap the main thread, so
+# their sum can exceed the wall time of such jobs.
+#
+# The current job belongs to the thread that started it (several printers
+# can print at once); helper threads are started through carry() to report
+# into the same job.
+
+import time
+import threading
+from contextlib import contextmanager
+
+STAGES = ("parse", "render", "preprocess", "rasterize", "usb_write")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_local = threading.local()  # per thread: current job, stack of nested stage child times
+_lock = threading.Lock()
+
+
+class JobMetrics:
+    def __init__(self, mode):
+        self.mode = mode
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.bytes = 0
+        self.usb_transfers = 0
+        self.usb_retries = 0
+        self.usb_stalls = 0
+        self.usb_stall_s = 0.0
+        self.status = "running"
+        self.total = None
+        self._start = time.perf_counter()
+
+    def add(self, name, seconds):
+        with _lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_transfer(self, nbytes, seconds, chunks=1, retries=0, stalls=0, stall_seconds=0.0):
+        with _lock:
+            self.stages["usb_write"] += seconds
+            self.bytes += nbytes
+            self.usb_transfers += chunks
+            self.usb_retries += retries
+            self.usb_stalls += stalls
+            self.usb_stall_s += stall_seconds
+
+    def to_dict(self):
+        total = self.total if self.total is not None else time.perf_counter() - self._start
+        usb_s = self.stages["usb_write"]
+        return {
+            "mode": self.mode,
+            "status": self.status,
+            "total_s": round(total, 6),
+            "stages_s": {k: round(v, 6) for k, v in self.stages.items()},
+            "other_s": round(max(0.0, total - sum(self.stages.values())), 6),
+            "bytes": self.bytes,
+            "usb_transfers": self.usb_transfers,
+            "usb_bytes_per_s": round(self.bytes / usb_s) if usb_s else None,
+            "usb_retries": self.usb_retries,
+            "usb_stalls": self.usb_stalls,
+            "usb_stall_s": round(self.usb_stall_s, 6),
+        }
+
+
+# ---------------------------
+# Job lifecycle
+# ---------------------------
+
+def start(mode):
+    _local.job = JobMetrics(mode)
+    return _local.job
+
+
+def finish(status="done"):
+    """
+    Close the current job, feed the histograms and return the job.
+    """
+    job = current()
+    _local.job = None
+    if job is None:
+        return None
+
+    job.total = time.perf_counter() - job._start
+    job.status = status
+    REGISTRY.record(job)
+    return job
+
+
+def current():
+    return getattr(_local, "job", None)
+
+
+def carry(func):
+    """
+    Wrap func so that, run in another thread, it reports into the job
+    that is current here.
+    """
+    job = current()
+
+    def run(*args, **kwargs):
+        _local.job = job
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.job = None
+    return run
+
+
+@contextmanager
+def stage(name):
+    job = current()
+    if job is None:
+        yield
+        return
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    start_t = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start_t
+        child = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        job.add(name, elapsed - child)
+
+
+def record_transfer(nbytes, seconds, chunks=1, retries=0, stalls=0, stall_seconds=0.0):
+    """
+    Called by the transport after each flush to the device.
+    """
+    job = current()
+    if job is None:
+        return
+    job.add_transfer(nbytes, seconds, chunks, retries, stalls, stall_seconds)
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1] += seconds
+
+
+# ---------------------------
+# Prometheus text exposition
+# ---------------------------
+
+class Registry:
+    def __init__(self):
+        self._histograms = {}   # (name, labels) -> [bucket counts, sum, count]
+        self._counters = {}     # (name, labels) -> value
+        self._buckets = {}      # name -> buckets
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, labels, value, buckets, help_text=""):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._buckets[name] = buckets
+            self._help.setdefault(name, help_text)
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, le in enumerate(buckets):
+                if value <= le:
+                    h[0][i] += 1
+            h[1] += value
+            h[2] += 1
+
+    def inc(self, name, labels, help_text="", amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record(self, job):
+        mode = job.mode or "unknown"
+        self.inc("thermal_jobs_total", {"mode": mode, "status": job.status},
+                 "Print jobs by mode and final status")
+        self.observe("thermal_job_duration_seconds", {"mode": mode, "stage": "total"},
+                     job.total, DURATION_BUCKETS, "Print job wall time and exclusive time per stage")
+        for name, seconds in job.stages.items():
+            self.observe("thermal_job_duration_seconds", {"mode": mode, "stage": name},
+                         seconds, DURATION_BUCKETS)
+        self.observe("thermal_job_bytes", {"mode": mode}, job.bytes, BYTES_BUCKETS,
+                     "ESC/POS bytes sent to the printer per job")
+        self.inc("thermal_usb_retries_total", {"mode": mode},
+                 "USB chunks resent after a write timeout", amount=job.usb_retries)
+        self.inc("thermal_usb_stalls_total", {"mode": mode},
+                 "USB chunk writes slower than the stall threshold", amount=job.usb_stalls)
+
+    def render(self):
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        out = []
+        with self._lock:
+            for name in sorted({k[0] for k in self._counters}):
+                out.append(f"# HELP {name} {self._help.get(name, '')}")
+                out.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name:
+                        out.append(f"{name}{fmt(labels)} {value}")
+
+            for name in sorted({k[0] for k in self._histograms}):
+                out.append(f"# HELP {name} {self._help.get(name, '')}")
+                out.append(f"# TYPE {name} histogram")
+                buckets = self._buckets[name]
+                for (n, labels), (counts, total, count) in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for le, c in zip(buckets, counts):
+                        out.append(f"{name}_bucket{fmt(labels, [('le', le)])} {c}")
+                    out.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {count}")
+                    out.append(f"{name}_sum{fmt(labels)} {total}")
+                    out.append(f"{name}_count{fmt(labels)} {count}")
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def prometheus_text():
+    return REGISTRY.render()
@@ -1,13 +1,48 @@
 #!/c/Users/fsock/AppData/Local/Programs/Python/Python310/python
 
 import sys
+import time
 import argparse
-import print_text
-import print_image
-import print_raw
-import printer_utils
-import print_markdown
-import print_image_tile
+import importlib
+import job_metrics
+
+_START = time.perf_counter()
+
+# Mode modules (and PIL, marko, ftfy, pyusb, python-escpos behind them) are
+# imported on first use, so e.g. --cut or a text job skip the image stack
+MODE_MODULES = {
+    "text": "print_text",
+    "markdown": "print_markdown",
+    "image": "print_image",
+    "image-tile": "print_image_tile",
+    "raw": "print_raw",
+}
+
+_import_seconds = 0.0
+
+def _load(name):
+    """
+    Import a module on first use; the time spent is reported by --timing.
+    """
+    global _import_seconds
+    module = sys.modules.get(name)
+    # another thread may still be importing it (pool workers): let importlib wait
+    if module is None or getattr(module.__spec__, "_initializing", False):
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        _import_seconds += time.perf_counter() - start
+    return module
+
+def _mode_module(mode):
+    if mode not in MODE_MODULES:
+        raise ValueError(f"Invalid mode: {mode}")
+    return _load(MODE_MODULES[mode])
+
+def __getattr__(name):
+    # keeps `from print import print_image` etc. working
+    if name in MODE_MODULES.values() or name == "printer_utils":
+        return _load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def is_image_file(path: str) -> bool:
     ext = path.lower().rsplit(".", 1)[-1]
@@ -50,6 +85,11 @@ def split_args(argv):
     parser.add_argument("--mode")
     parser.add_argument("-c", "--cut", action="store_true")
     parser.add_argument("--help-all", action="store_true")
+    parser.add_argument("--compile", metavar="OUT")
+    parser.add_argument("--simulate", action="store_true")
+    parser.add_argument("--sim-timeline", metavar="JSON")
+    parser.add_argument("--timing", action="store_true")
+    parser.add_argument("--via-daemon", action="store_true")
 
     args, remaining = parser.parse_known_args(argv)
 
@@ -67,39 +107,76 @@ def split_args(argv):
 def show_all_help():
     print("\n=== print_text options ===")
     try:
-        print_text.main(["-h"])
+        _load("print_text").main(["-h"])
     except SystemExit:
         pass
     print("\n=== print_image options ===")
     try:
-        print_image.main(["-h"])
+        _load("print_image").main(["-h"])
     except SystemExit:
         pass
     
     print("\n=== print_image_tile options ===")
     try:
-        print_image_tile.main(["-h"])
+        _load("print_image_tile").main(["-h"])
     except SystemExit:
         pass
 
     print("\n=== print markdown options ===")
     try:
-        print_markdown.main(["-h"])
+        _load("print_markdown").main(["-h"])
     except SystemExit:
         pass
 
     print("\n=== print_raw options ===")
     try:
-        print_raw.main(["-h"])
+        _load("print_raw").main(["-h"])
     except SystemExit:
         pass
     
-def core_print(file=None, mode=None, cut=False, extra_args=None):
+def _print_data(mode, data, options):
+    """
+    Dispatch in-memory input (str / bytes / PIL image) to a mode's Python API.
+    """
+    module = _mode_module(mode)
+    if mode == "text":
+        module.print_string(data, **options)
+    elif mode == "markdown":
+        if isinstance(data, (bytes, bytearray)):
+            data = bytes(data).decode("utf-8", errors="replace")
+        module.render_markdown(data)
+    elif mode == "image":
+        module.print_image_cmd(data, **options)
+    elif mode == "image-tile":
+        module.print_image_tile(data, **options)
+    elif mode == "raw":
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        module.print_raw(data=data, **options)
+
+def _dispatch(mode, file, extra_args, data, options):
+    if data is not None:
+        _print_data(mode, data, options or {})
+        return
+
+    submodule_args = []
+    if file:
+        submodule_args.append(file)
+    submodule_args.extend(extra_args)
+
+    _mode_module(mode).main(submodule_args)
+
+def core_print(file=None, mode=None, cut=False, extra_args=None, data=None, options=None):
     """
     Pure print executor.
     No autodetection.
     No CLI behavior.
     Raises exceptions on error.
+
+    Either file (+ extra_args, parsed by the mode's CLI) or data
+    (+ options, keyword arguments for the mode's Python API) is printed.
+
+    Returns the job's metrics (see job_metrics.JobMetrics.to_dict).
     """
 
     if extra_args is None:
@@ -108,26 +185,122 @@ def core_print(file=None, mode=None, cut=False, extra_args=None):
     if not mode:
         raise ValueError("Mode must be explicitly provided")
 
-    submodule_args = []
-    if file:
-        submodule_args.append(file)
-    submodule_args.extend(extra_args)
+    if data is not None and (file or extra_args):
+        raise ValueError("Pass either data/options or file/extra_args, not both")
 
-    if mode == "text":
-        print_text.main(submodule_args)
-    elif mode == "markdown":
-        print_markdown.main(submodule_args)
-    elif mode == "image":
-        print_image.main(submodule_args)
-    elif mode == "image-tile":
-        print_image_tile.main(submodule_args)
-    elif mode == "raw":
-        print_raw.main(submodule_args)
-    else:
-        raise ValueError(f"Invalid mode: {mode}")
+    # imports are not part of the job's timings
+    _mode_module(mode)
+    printer_utils = _load("printer_utils")
+
+    job_metrics.start(mode)
+    status = "failed"
+    try:
+        with job_metrics.stage("render"):
+            _dispatch(mode, file, extra_args, data, options)
+
+        if cut:
+            printer_utils.cut_paper()
+        else:
+            printer_utils.flush()
+        status = "done"
+    finally:
+        metrics = job_metrics.finish(status)
+        # per job, also when it failed: the counters must not leak into the next one
+        cp_stats = printer_utils.codepage_stats(reset=True)
+
+    if cp_stats and cp_stats["skipped"]:
+        printer_utils.logger.info(
+            f"prt - codepage: {cp_stats['switches']} switches sent, "
+            f"{cp_stats['skipped']} skipped ({cp_stats['bytes_saved']} bytes saved)"
+        )
+
+    return metrics.to_dict()
+
+def compile_job(out_path, file=None, mode=None, cut=False, extra_args=None):
+    """
+    Render a job against an in-memory printer and write the byte stream
+    to out_path (replay later with: print.py --mode raw out_path).
+    """
+    printer_utils = _load("printer_utils")
+    capture = printer_utils.use_capture()
+    start = time.perf_counter()
+    try:
+        if mode:
+            core_print(file=file, mode=mode, cut=cut, extra_args=extra_args)
+        elif cut:
+            printer_utils.cut_paper()
+        printer_utils.flush()
+    finally:
+        printer_utils.set_backend(None)
+    elapsed = time.perf_counter() - start
+
+    size = capture.save(out_path)
+    print(f"compiled {size} bytes to {out_path} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return size
+
+def simulate_job(timeline_path=None, file=None, mode=None, cut=False, extra_args=None):
+    """
+    Run a job against the simulated printer and report the modelled
+    transfer / print time.
+    """
+    printer_utils = _load("printer_utils")
+    printer_sim = _load("printer_sim")
 
-    if cut:
-        printer_utils.cut_paper()
+    sim = printer_sim.use_simulator()
+    try:
+        if mode:
+            core_print(file=file, mode=mode, cut=cut, extra_args=extra_args)
+        elif cut:
+            printer_utils.cut_paper()
+        printer_utils.flush()
+    finally:
+        printer_utils.set_backend(None)
+
+    stats = sim.stats()
+    print(
+        f"simulated {stats['bytes']} bytes, {stats['paper_mm']} mm paper: "
+        f"host {stats['host_seconds']:.2f} s (stalled {stats['stall_seconds']:.2f} s), "
+        f"printed {stats['printed_seconds']:.2f} s",
+        file=sys.stderr
+    )
+    if timeline_path:
+        sim.save_timeline(timeline_path)
+    return stats
+
+def print_via_daemon(file=None, mode=None, cut=False, extra_args=None):
+    """
+    Hand the job to a running print_daemon; print directly if there is none.
+    """
+    print_daemon = _load("print_daemon")
+    try:
+        reply = print_daemon.submit(mode=mode, file=file, cut=cut, extra_args=extra_args)
+    except print_daemon.DaemonUnavailable as e:
+        print(f"{e}; printing directly", file=sys.stderr)
+        if mode:
+            return core_print(file=file, mode=mode, cut=cut, extra_args=extra_args)
+        _load("printer_utils").cut_paper()
+        return None
+
+    if reply["status"] != "done":
+        raise RuntimeError(f"Print daemon job failed: {reply.get('error')}")
+    return reply.get("metrics")
+
+def report_timing(metrics=None):
+    """
+    --timing: module import time against the time spent printing.
+    """
+    total = time.perf_counter() - _START
+    line = (
+        f"timing: imports {_import_seconds * 1000:.1f} ms, "
+        f"work {(total - _import_seconds) * 1000:.1f} ms, "
+        f"total {total * 1000:.1f} ms"
+    )
+    if metrics:
+        stages = ", ".join(
+            f"{name} {seconds * 1000:.1f}" for name, seconds in metrics["stages_s"].items() if seconds
+        )
+        line += f" (job {metrics['total_s'] * 1000:.1f} ms: {stages}; {metrics['bytes']} bytes)"
+    print(line, file=sys.stderr)
 
 def main_with_args(argv):
 
@@ -137,23 +310,53 @@ def main_with_args(argv):
         show_all_help()
         return
 
-    mode = args.mode or detect_input_type(file)
+    metrics = None
 
-    if not mode:
-        if args.cut:
-            printer_utils.cut_paper()
-            return
-        else:
+    if args.compile:
+        compile_job(
+            args.compile,
+            file=file,
+            mode=args.mode or detect_input_type(file),
+            cut=args.cut,
+            extra_args=extras
+        )
+
+    elif args.simulate or args.sim_timeline:
+        simulate_job(
+            args.sim_timeline,
+            file=file,
+            mode=args.mode or detect_input_type(file),
+            cut=args.cut,
+            extra_args=extras
+        )
+
+    else:
+        mode = args.mode or detect_input_type(file)
+
+        if not mode and not args.cut:
             parser = argparse.ArgumentParser()
             parser.print_help()
             return
 
-    core_print(
-        file=file,
-        mode=mode,
-        cut=args.cut,
-        extra_args=extras
-    )
+        if args.via_daemon:
+            metrics = print_via_daemon(
+                file=file,
+                mode=mode,
+                cut=args.cut,
+                extra_args=extras
+            )
+        elif not mode:
+            _load("printer_utils").cut_paper()
+        else:
+            metrics = core_print(
+                file=file,
+                mode=mode,
+                cut=args.cut,
+                extra_args=extras
+            )
+
+    if args.timing:
+        report_timing(metrics)
                             
 def main():
     main_with_args(sys.argv[1:])            
@@ -0,0 +1,231 @@
+# print_daemon.py — resident print daemon + thin client over a Unix socket
+#
+# The daemon imports every mode, opens the printer once and keeps both warm;
+# `print.py --via-daemon` streams the job to it instead of paying for
+# interpreter startup, imports and USB discovery on every call.
+#
+#   python print_daemon.py                  # run the daemon
+#   python print.py --via-daemon file.txt   # print through it
+#
+# Protocol (one job per connection): a JSON header line, then "size" bytes
+# of input; the daemon answers with one JSON line when the job has finished.
+
+import os
+import sys
+import json
+import socket
+import tempfile
+
+SOCKET_PATH = os.getenv(
+    "THERMAL_DAEMON_SOCKET",
+    os.path.join(
+        os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+        f"print-esc-pos-{os.getuid() if hasattr(os, 'getuid') else 0}.sock"
+    )
+)
+CHUNK_SIZE = 64 * 1024
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+# ---------------------------
+# Client
+# ---------------------------
+
+def submit(mode=None, file=None, cut=False, extra_args=None, data=None, socket_path=SOCKET_PATH):
+    """
+    Run a job on the daemon and return its reply ({"status", "metrics"|"error"}).
+    file is streamed if it exists locally; data (bytes) is streamed as is;
+    with neither, stdin is read when a mode is given.
+    Raises DaemonUnavailable if no daemon is listening.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix sockets are not supported on this platform")
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    except OSError as e:
+        raise DaemonUnavailable(f"No print daemon at {socket_path}: {e}")
+
+    header = {"mode": mode, "cut": cut, "extra_args": extra_args or [], "size": 0, "cwd": os.getcwd()}
+    source = None
+
+    if data is None and file and os.path.isfile(file):
+        header["size"] = os.path.getsize(file)
+        header["suffix"] = os.path.splitext(file)[1]
+        source = open(file, "rb")
+    elif data is None and file:
+        header["path"] = file       # e.g. "a.png|b.png", resolved by the daemon
+    elif data is None and mode:
+        data = sys.stdin.buffer.read()
+
+    if data is not None:
+        header["size"] = len(data)
+
+    with sock:
+        try:
+            sock.sendall(json.dumps(header).encode("utf-8") + b"\n")
+            if source is not None:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sock.sendall(chunk)
+            elif data:
+                sock.sendall(data)
+        finally:
+            if source is not None:
+                source.close()
+
+        reply = sock.makefile("rb").readline()
+
+    if not reply:
+        raise RuntimeError("Print daemon closed the connection without a reply")
+    return json.loads(reply)
+
+
+# ---------------------------
+# Daemon
+# ---------------------------
+
+def _run_job(header, path):
+    import print as print_module
+
+    # relative paths (markdown images, "a.png|b.png") are the client's;
+    # jobs run one at a time on the worker, so chdir is safe here
+    if header.get("cwd") and os.path.isdir(header["cwd"]):
+        os.chdir(header["cwd"])
+    try:
+        return print_module.core_print(
+            file=path,
+            mode=header["mode"],
+            cut=header["cut"],
+            extra_args=header["extra_args"]
+        )
+    except SystemExit as e:
+        # a mode's argparse rejected the arguments; keep the worker alive
+        raise ValueError(f"Invalid arguments for mode {header['mode']} (exit {e.code})")
+
+
+def _run_cut():
+    import printer_utils
+    printer_utils.cut_paper()
+
+
+def serve(socket_path=SOCKET_PATH):
+    import signal
+    import socketserver
+    import print as print_module
+    import print_queue
+    import printer_utils
+
+    # Warm up: every mode module and the printer session
+    for name in print_module.MODE_MODULES.values():
+        print_module._load(name)
+    try:
+        printer_utils.find_printer()
+    except printer_utils.PrinterError as e:
+        printer_utils.logger.warning(f"prt - daemon: printer not ready yet ({e})")
+    if printer_utils.STATUS_INTERVAL > 0:
+        printer_utils.start_status_monitor()
+
+    jobs = print_queue.PrintQueue(name="print-daemon-worker")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            tmp_path = None
+            try:
+                header = json.loads(self.rfile.readline())
+                size = header.get("size", 0)
+                path = header.get("path")
+
+                if size:
+                    fd, tmp_path = tempfile.mkstemp(prefix="thermal_", suffix=header.get("suffix") or "")
+                    with os.fdopen(fd, "wb") as f:
+                        remaining = size
+                        while remaining:
+                            chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                            if not chunk:
+                                raise ValueError("Client disconnected mid-job")
+                            f.write(chunk)
+                            remaining -= len(chunk)
+                    path = tmp_path
+
+                if header.get("mode"):
+                    job = jobs.submit(lambda: _run_job(header, path), mode=header["mode"])
+                else:
+                    job = jobs.submit(_run_cut, mode="cut")
+                job.wait()
+
+                if job.status == "done":
+                    reply = {"status": "done", "job_id": job.id, "metrics": job.result}
+                else:
+                    reply = {"status": "failed", "job_id": job.id, "error": job.error}
+            except Exception as e:
+                reply = {"status": "failed", "error": str(e)}
+            finally:
+                if tmp_path:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    _remove_stale_socket(socket_path)
+    server = Server(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+    printer_utils.logger.info(f"prt - daemon listening on {socket_path}")
+
+    # systemd / kill: leave through the same cleanup as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+        printer_utils.reset_printer(verbose=False)
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)      # left behind by a daemon that died
+    else:
+        probe.close()
+        raise RuntimeError(f"A print daemon is already running on {socket_path}")
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Keep the printer open and serve print.py --via-daemon jobs.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Unix socket path (default: {SOCKET_PATH})")
+    parser.add_argument("--simulate", action="store_true", help="Print to printer_sim instead of USB")
+    parsed = parser.parse_args(args)
+
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("Unix sockets are not supported on this platform")
+    if parsed.simulate:
+        import printer_sim
+        printer_sim.use_simulator(keep_output=False)
+    serve(parsed.socket)
+
+
+if __name__ == "__main__":
+    main()
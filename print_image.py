@@ -1,8 +1,14 @@
+import io
 import sys
+import queue
+import threading
 from PIL import Image
 import argparse
 import os
 import printer_utils
+import raster_cache
+import dither
+import job_metrics
 
 # Printer constants
 PRINTER_CHAR_WIDTH  = printer_utils.PRINTER_CHAR_WIDTH
@@ -13,6 +19,21 @@ PRINTER_DPI         = printer_utils.PRINTER_DPI
 HORIZONTAL_SCALE_CORRECTION = 1.00
 VERTICAL_SCALE_CORRECTION = 1.012
 
+# Preprocessing tuning
+FORCE_FULL_WIDTH = True          # force resize to printer width
+CONTRAST_FACTOR = 1.5            # 1.5–2.5 typical
+SHARPEN = False
+THRESHOLD = 80                   # 160–200 typical, "threshold" only
+DITHER_ALGORITHM = "pil"         # see dither.ALGORITHMS; "threshold" for maps/text
+
+# Banded mode
+BAND_ROWS = 256                  # rows per GS v 0 block
+DITHER_LEAD_IN_ROWS = 16         # rows above a band dithered with it
+
+# White rows sent as paper feed instead of raster data
+SKIP_BLANK_ROWS = True
+MIN_BLANK_ROWS = 16              # shorter runs are not worth a new GS v 0 block
+
 
 # ---------------------------
 # Helpers
@@ -43,40 +64,168 @@ def _open_image(image_input):
         return Image.open(image_input)
     elif isinstance(image_input, Image.Image):
         return image_input
+    elif isinstance(image_input, (bytes, bytearray)):
+        return Image.open(io.BytesIO(image_input))
     else:
-        raise TypeError("image_input must be a filename or PIL.Image.Image instance")
+        raise TypeError("image_input must be a filename, bytes or PIL.Image.Image instance")
     
+# XOR table: PIL "1" bits are 1 = white, GS v 0 bits are 1 = black
+_INVERT_BITS = bytes(b ^ 0xFF for b in range(256))
+# _ROW_END_MASK[n]: keep the first n bits of a row's last byte (pad = white)
+_ROW_END_MASK = [
+    bytes(b & ((0xFF << (8 - n)) & 0xFF) for b in range(256)) for n in range(8)
+]
+
+
 def pil_to_escpos_raster(img):
     """
-    Convert 1-bit PIL image to ESC/POS GS v 0 raster format
+    Convert 1-bit PIL image to ESC/POS GS v 0 raster format.
+
+    PIL already stores mode "1" images as MSB-first packed rows padded to a
+    whole byte, which is exactly the GS v 0 layout except that PIL uses
+    1 = white. The bits are flipped and each row's padding cleared again.
     """
     if img.mode != "1":
         raise ValueError("Image must be 1-bit")
 
-    width, height = img.size
-    width_bytes = (width + 7) // 8
+    with job_metrics.stage("rasterize"):
+        width, height = img.size
+        width_bytes = (width + 7) // 8
+
+        data = bytearray(img.tobytes().translate(_INVERT_BITS))
+        if width % 8 and height:
+            last = slice(width_bytes - 1, None, width_bytes)
+            data[last] = bytes(data[last]).translate(_ROW_END_MASK[width % 8])
+
+        header = bytearray([
+            0x1D, 0x76, 0x30, 0x00,
+            width_bytes & 0xFF,
+            (width_bytes >> 8) & 0xFF,
+            height & 0xFF,
+            (height >> 8) & 0xFF
+        ])
+
+        return header + data
+
+
+def blank_row_runs(raster, min_rows=MIN_BLANK_ROWS):
+    """
+    (start, end) row ranges of a GS v 0 raster that are entirely white,
+    at least min_rows long and worth feeding instead (see blank_run_saving).
+    """
+    width_bytes = raster[4] | (raster[5] << 8)
+    height = raster[6] | (raster[7] << 8)
+    data = memoryview(raster)[8:]
+    white = bytes(width_bytes)
+
+    runs = []
+    start = None
+    for y in range(height + 1):
+        blank = y < height and data[y * width_bytes:(y + 1) * width_bytes] == white
+        if blank and start is None:
+            start = y
+        elif not blank and start is not None:
+            if y - start >= min_rows and blank_run_saving(start, y, width_bytes, height) > 0:
+                runs.append((start, y))
+            start = None
+    return runs
+
+
+def blank_run_saving(start, end, width_bytes, height):
+    """
+    Bytes saved by feeding rows start..end of a GS v 0 image with ESC J:
+    the rows' data, less the feed and the 8-byte header of the extra block
+    a run in the middle splits off (a run covering the image drops one).
+    """
+    split = (start > 0 and end < height) - (start == 0 and end == height)
+    return (end - start) * width_bytes - len(feed_rows(end - start)) - 8 * split
 
-    pixels = img.load()
-    data = bytearray()
 
-    for y in range(height):
-        for xb in range(width_bytes):
-            byte = 0
-            for bit in range(8):
-                x = xb * 8 + bit
-                if x < width and pixels[x, y] == 0:  # black pixel
-                    byte |= (1 << (7 - bit))
-            data.append(byte)
+def feed_rows(rows):
+    """
+    ESC J n commands feeding rows dots. Assumes the default vertical motion
+    unit of one dot (203 dpi printers; GS P would change it).
+    """
+    out = bytearray()
+    while rows > 0:
+        n = min(rows, 255)
+        out += b"\x1bJ" + bytes([n])
+        rows -= n
+    return bytes(out)
 
-    header = bytearray([
-        0x1D, 0x76, 0x30, 0x00,
-        width_bytes & 0xFF,
-        (width_bytes >> 8) & 0xFF,
-        height & 0xFF,
-        (height >> 8) & 0xFF
-    ])
 
-    return header + data
+def strip_blank_rows(raster, min_rows=MIN_BLANK_ROWS):
+    """
+    Rewrite one GS v 0 raster so runs of white rows become ESC J feeds
+    between smaller GS v 0 blocks. Same paper output, fewer bytes.
+    Returns (data, bytes_saved).
+    """
+    runs = blank_row_runs(raster, min_rows)
+    if not runs:
+        return raster, 0
+
+    width_bytes = raster[4] | (raster[5] << 8)
+    height = raster[6] | (raster[7] << 8)
+    data = memoryview(raster)[8:]
+
+    def block(y0, y1):
+        rows = y1 - y0
+        return bytes([
+            0x1D, 0x76, 0x30, 0x00,
+            width_bytes & 0xFF, (width_bytes >> 8) & 0xFF,
+            rows & 0xFF, (rows >> 8) & 0xFF
+        ]) + data[y0 * width_bytes:y1 * width_bytes]
+
+    out = bytearray()
+    y = 0
+    for start, end in runs:
+        if start > y:
+            out += block(y, start)
+        out += feed_rows(end - start)
+        y = end
+    if y < height:
+        out += block(y, height)
+
+    return bytes(out), len(raster) - len(out)
+
+
+def send_raster_image(printer, img, raw_mode=False, raster=None, skip_blank=None):
+    """
+    Print a 1-bit image, raw (GS v 0 via _raw) or through printer.image().
+    With skip_blank, white row runs are fed with ESC J instead of being
+    sent as raster data. Returns the number of bytes saved.
+    """
+    if skip_blank is None:
+        skip_blank = SKIP_BLANK_ROWS
+    if raster is None:
+        raster = pil_to_escpos_raster(img)
+
+    if raw_mode:
+        saved = 0
+        if skip_blank:
+            raster, saved = strip_blank_rows(raster)
+        printer._raw(raster)
+        return saved
+
+    runs = blank_row_runs(raster) if skip_blank else []
+    if not runs:
+        with job_metrics.stage("rasterize"):
+            printer.image(img, impl='bitImageRaster')
+        return 0
+
+    # every crop is its own printer.image() call with its own GS v 0 header
+    width_bytes = (img.width + 7) // 8
+    saved = 0
+    y = 0
+    for start, end in runs + [(img.height, img.height)]:
+        if start > y:
+            with job_metrics.stage("rasterize"):
+                printer.image(img.crop((0, y, img.width, start)), impl='bitImageRaster')
+        if end > start:
+            printer._raw(feed_rows(end - start))
+            saved += blank_run_saving(start, end, width_bytes, img.height)
+        y = end
+    return saved
 
 
 # ---------------------------
@@ -106,74 +255,71 @@ def combine_images_horizontally(image_paths, spacing=0):
 # Core printing
 # ---------------------------
 
-def core_print_image(
-    image_input,
+def target_size(
+    orig_width,
+    orig_height,
     scale_width_percentage=None,
-    align_param="left",
     target_width_mm=None,
-    target_height_mm=None,
-    printer=None,
-    raw_mode=False
+    target_height_mm=None
 ):
     """
-    Enhanced image printing with controlled preprocessing and optional RAW mode.
+    Printed size in pixels for an image, or None if it is kept as is.
     """
+    aspect_ratio = orig_height / orig_width if orig_width else 1.0
 
-    # ---------------------------
-    # TUNING VARIABLES
-    # ---------------------------
-    USE_RAW_MODE = raw_mode          
-    FORCE_FULL_WIDTH = True          # force resize to printer width
-    CONTRAST_FACTOR = 1.5            # 1.5–2.5 typical
-    SHARPEN = False
-    THRESHOLD = 80                   # 160–200 typical
-    ENABLE_DITHER = True             # usually False for maps/text
+    if target_width_mm or target_height_mm:
+        if target_width_mm and not target_height_mm:
+            target_width_px = mm_to_pixels(target_width_mm, axis="x")
+            target_height_px = int(target_width_px * aspect_ratio)
 
-    try:
-        if printer is None:
-            printer = printer_utils.find_printer(verbose=False)
+        elif target_height_mm and not target_width_mm:
+            target_height_px = mm_to_pixels(target_height_mm, axis="y")
+            target_width_px = int(target_height_px / aspect_ratio)
 
-        printer_utils.reset_formatting(printer)
-
-        img = _open_image(image_input)
-        orig_width, orig_height = img.size
-        aspect_ratio = orig_height / orig_width if orig_width else 1.0
-
-        # ---------------------------
-        # RESIZE (CRITICAL)
-        # ---------------------------
-        if target_width_mm or target_height_mm:
-            if target_width_mm and not target_height_mm:
-                target_width_px = mm_to_pixels(target_width_mm, axis="x")
-                target_height_px = int(target_width_px * aspect_ratio)
+        else:
+            target_width_px = mm_to_pixels(target_width_mm, axis="x")
+            target_height_px = mm_to_pixels(target_height_mm, axis="y")
 
-            elif target_height_mm and not target_width_mm:
-                target_height_px = mm_to_pixels(target_height_mm, axis="y")
-                target_width_px = int(target_height_px / aspect_ratio)
+        return target_width_px, target_height_px
 
-            else:
-                target_width_px = mm_to_pixels(target_width_mm, axis="x")
-                target_height_px = mm_to_pixels(target_height_mm, axis="y")
+    elif scale_width_percentage:
+        target_width = int((scale_width_percentage / 100.0) * PRINTER_WIDTH_PX)
+        return target_width, int(target_width * aspect_ratio)
 
-            img = img.resize((target_width_px, target_height_px), Image.Resampling.NEAREST)
+    elif FORCE_FULL_WIDTH:
+        target_width = PRINTER_WIDTH_PX
+        return target_width, int(target_width * aspect_ratio)
 
-        elif scale_width_percentage:
-            target_width = int((scale_width_percentage / 100.0) * PRINTER_WIDTH_PX)
-            target_height = int(target_width * aspect_ratio)
+    elif orig_width > PRINTER_WIDTH_PX:
+        return PRINTER_WIDTH_PX, int(PRINTER_WIDTH_PX * aspect_ratio)
 
-            img = img.resize((target_width, target_height), Image.Resampling.NEAREST)
+    return None
 
-        elif FORCE_FULL_WIDTH:
-            target_width = PRINTER_WIDTH_PX
-            target_height = int(target_width * aspect_ratio)
 
-            img = img.resize((target_width, target_height), Image.Resampling.NEAREST)
+def prepare_image(
+    img,
+    scale_width_percentage=None,
+    target_width_mm=None,
+    target_height_mm=None,
+    dither_algorithm=None,
+    threshold=None
+):
+    """
+    Resize + contrast + 1-bit conversion. Returns a mode "1" image.
+    """
+    dither_algorithm = dither_algorithm or DITHER_ALGORITHM
+    threshold = THRESHOLD if threshold is None else threshold
 
-        elif orig_width > PRINTER_WIDTH_PX:
-            img = img.resize(
-                (PRINTER_WIDTH_PX, int(PRINTER_WIDTH_PX * aspect_ratio)),
-                Image.Resampling.NEAREST
-            )
+    with job_metrics.stage("preprocess"):
+        # ---------------------------
+        # RESIZE (CRITICAL)
+        # ---------------------------
+        size = target_size(
+            img.width, img.height,
+            scale_width_percentage, target_width_mm, target_height_mm
+        )
+        if size:
+            img = img.resize(size, Image.Resampling.NEAREST)
 
         # ---------------------------
         # PREPROCESSING
@@ -187,10 +333,306 @@ def core_print_image(
         if SHARPEN:
             img = img.filter(ImageFilter.SHARPEN)
 
-        if ENABLE_DITHER:
-            img = img.convert("1")  # PIL dithering
+        return dither.to_1bit(img, dither_algorithm, threshold)
+
+
+# ---------------------------
+# Banded processing
+# ---------------------------
+
+def iter_prepared_bands(
+    image_input,
+    band_rows=BAND_ROWS,
+    scale_width_percentage=None,
+    target_width_mm=None,
+    target_height_mm=None,
+    dither_algorithm=None,
+    threshold=None
+):
+    """
+    Same result as prepare_image(), produced top to bottom in 1-bit bands
+    of at most band_rows rows, so only one band is processed at a time.
+
+    Contrast uses the mean of the whole resized image (one cheap histogram
+    pass first), exactly like ImageEnhance.Contrast; Otsu uses the global
+    histogram too. The NumPy error diffusers carry their error into the
+    next band and Bayer keeps its row phase, so both match the unbanded
+    result. PIL's ditherer cannot be seeded with an error state, so for
+    "pil" each band is dithered together with DITHER_LEAD_IN_ROWS rows
+    above it: the diffusion state at the band edge is rebuilt from real
+    content and there is no seam.
+    """
+    from PIL import ImageFilter
+
+    dither_algorithm = dither_algorithm or DITHER_ALGORITHM
+    threshold = THRESHOLD if threshold is None else threshold
+
+    img = _open_image(image_input)
+    src_w, src_h = img.size
+    out_w, out_h = target_size(
+        src_w, src_h,
+        scale_width_percentage, target_width_mm, target_height_mm
+    ) or img.size
+
+    if (out_w, out_h) != (src_w, src_h):
+        source_row = _nearest_rows(src_h, out_h)
+
+    def gray_rows(y0, y1):
+        if (out_w, out_h) == (src_w, src_h):
+            return img.crop((0, y0, out_w, y1)).convert("L")
+        # exact source rows, scaled horizontally only; then each output
+        # row takes the source row the full NEAREST resize would pick
+        top, bottom = source_row[y0], source_row[y1 - 1] + 1
+        strip = img.crop((0, top, src_w, bottom)).resize((out_w, bottom - top), Image.Resampling.NEAREST).convert("L")
+        rows = Image.new("L", (out_w, y1 - y0))
+        y = y0
+        while y < y1:
+            # runs of consecutive source rows are copied in one piece
+            end = y + 1
+            while end < y1 and source_row[end] == source_row[end - 1] + 1:
+                end += 1
+            r = source_row[y] - top
+            rows.paste(strip.crop((0, r, out_w, r + end - y)), (0, y - y0))
+            y = end
+        return rows
+
+    # Pass 1: global mean for the contrast stretch
+    hist = [0] * 256
+    for y0 in range(0, out_h, band_rows):
+        for i, c in enumerate(gray_rows(y0, min(out_h, y0 + band_rows)).histogram()):
+            hist[i] += c
+    total = sum(hist)
+    mean = int(sum(i * c for i, c in enumerate(hist)) / total + 0.5) if total else 0
+
+    if dither_algorithm == "otsu":
+        # histogram after contrast, mapped through the same blend as a LUT
+        ramp = Image.frombytes("L", (256, 1), bytes(range(256)))
+        lut = Image.blend(Image.new("L", ramp.size, mean), ramp, CONTRAST_FACTOR).tobytes()
+        stretched = [0] * 256
+        for i, c in enumerate(hist):
+            stretched[lut[i]] += c
+        threshold = dither.otsu_threshold(stretched)
+        dither_algorithm = "threshold"
+
+    diffuser = None
+    if dither_algorithm in dither.ERROR_DIFFUSION:
+        diffuser = dither.ErrorDiffuser(dither_algorithm)
+
+    lead = 1 if SHARPEN else 0
+    if dither_algorithm == "pil":
+        lead = max(lead, DITHER_LEAD_IN_ROWS)
+    tail = 1 if SHARPEN else 0
+
+    # Pass 2: process and yield each band
+    for y0 in range(0, out_h, band_rows):
+        y1 = min(out_h, y0 + band_rows)
+        a = max(0, y0 - lead)
+        b = min(out_h, y1 + tail)
+
+        with job_metrics.stage("preprocess"):
+            band = gray_rows(a, b)
+            band = Image.blend(Image.new("L", band.size, mean), band, CONTRAST_FACTOR)
+
+            if SHARPEN:
+                band = band.filter(ImageFilter.SHARPEN)
+
+            if dither_algorithm == "pil":
+                out = band.convert("1").crop((0, y0 - a, out_w, y1 - a))
+            else:
+                band = band.crop((0, y0 - a, out_w, y1 - a))
+                if diffuser:
+                    out = diffuser.process(band)
+                elif dither_algorithm in ("bayer4", "bayer8"):
+                    out = dither.ordered(band, int(dither_algorithm[5:]), y_offset=y0)
+                else:
+                    out = dither.to_1bit(band, dither_algorithm, threshold)
+        yield out
+
+
+def _nearest_rows(src_h, out_h):
+    """
+    Source row of every output row in a NEAREST resize from src_h to out_h
+    rows: a one pixel wide image of row numbers, resized by PIL itself, so
+    the mapping matches Image.resize() exactly (its float stepping differs
+    from resizing each band with a box).
+    """
+    import array
+    index = Image.frombytes("I", (1, src_h), array.array("i", range(src_h)).tobytes())
+    return list(index.resize((1, out_h), Image.Resampling.NEAREST).getdata())
+
+
+def print_image_banded(
+    image_input,
+    printer,
+    band_rows=BAND_ROWS,
+    raw_mode=False,
+    scale_width_percentage=None,
+    target_width_mm=None,
+    target_height_mm=None,
+    dither_algorithm=None,
+    threshold=None
+):
+    """
+    Send an image as one GS v 0 block per band. A worker thread prepares
+    the next bands while the current one is written; at most four bands
+    are held in memory (two queued, one being produced, one being sent).
+    Returns the bytes saved on blank rows.
+    """
+    bands = queue.Queue(maxsize=2)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for band in iter_prepared_bands(
+                image_input,
+                band_rows=band_rows,
+                scale_width_percentage=scale_width_percentage,
+                target_width_mm=target_width_mm,
+                target_height_mm=target_height_mm,
+                dither_algorithm=dither_algorithm,
+                threshold=threshold
+            ):
+                if stop.is_set():
+                    return
+                bands.put(band)
+            bands.put(done)
+        except Exception as e:
+            bands.put(e)
+
+    worker = threading.Thread(target=job_metrics.carry(produce), name="raster-bands", daemon=True)
+    worker.start()
+    saved = 0
+
+    try:
+        while True:
+            band = bands.get()
+            if band is done:
+                break
+            if isinstance(band, Exception):
+                raise band
+
+            saved += send_raster_image(printer, band, raw_mode)
+            printer_utils.flush(printer)
+    finally:
+        stop.set()
+        # unblock a producer waiting on a full queue
+        while worker.is_alive():
+            try:
+                bands.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    return saved
+
+
+def _raster_params(scale_width_percentage, target_width_mm, target_height_mm,
+                   dither_algorithm=None, threshold=None):
+    """
+    Everything besides the source pixels that changes the prepared raster.
+    Alignment is not part of it: it is applied with ESC a at print time.
+    """
+    return {
+        "scale": scale_width_percentage,
+        "width_mm": target_width_mm,
+        "height_mm": target_height_mm,
+        "printer_width_px": PRINTER_WIDTH_PX,
+        "dpi": PRINTER_DPI,
+        "correction": (HORIZONTAL_SCALE_CORRECTION, VERTICAL_SCALE_CORRECTION),
+        "full_width": FORCE_FULL_WIDTH,
+        "contrast": CONTRAST_FACTOR,
+        "sharpen": SHARPEN,
+        "dither": dither_algorithm or DITHER_ALGORITHM,
+        "threshold": THRESHOLD if threshold is None else threshold,
+    }
+
+
+def _log_blank_rows(saved):
+    if saved:
+        printer_utils.logger.info(f"prt - blank rows fed instead of rastered: {saved} bytes saved")
+
+
+def core_print_image(
+    image_input,
+    scale_width_percentage=None,
+    align_param="left",
+    target_width_mm=None,
+    target_height_mm=None,
+    printer=None,
+    raw_mode=False,
+    use_cache=True,
+    band_rows=None,
+    dither_algorithm=None,
+    threshold=None
+):
+    """
+    Enhanced image printing with controlled preprocessing and optional RAW mode.
+    Prepared rasters are cached by content + settings (see raster_cache).
+    With band_rows the image is streamed in bands instead (not cached).
+    """
+
+    USE_RAW_MODE = raw_mode
+
+    try:
+        if printer is None:
+            printer = printer_utils.find_printer(verbose=False)
+
+        printer_utils.reset_formatting(printer)
+
+        if band_rows:
+            printer.set(align=_normalize_align(align_param))
+            saved = print_image_banded(
+                image_input,
+                printer,
+                band_rows=band_rows,
+                raw_mode=USE_RAW_MODE,
+                scale_width_percentage=scale_width_percentage,
+                target_width_mm=target_width_mm,
+                target_height_mm=target_height_mm,
+                dither_algorithm=dither_algorithm,
+                threshold=threshold
+            )
+            _log_blank_rows(saved)
+            return True
+
+        # Read files once: the bytes are both the cache key and the image
+        source = image_input
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"Image file not found: {source}")
+            with open(source, "rb") as f:
+                source = f.read()
+
+        cache = raster_cache.get_cache() if use_cache else None
+        key = cached = None
+        if cache is not None:
+            key = raster_cache.make_key(
+                source,
+                **_raster_params(
+                    scale_width_percentage, target_width_mm, target_height_mm,
+                    dither_algorithm, threshold
+                )
+            )
+            cached = cache.get(key)
+
+        if cached is not None:
+            raster = cached.raster
+            img = None if USE_RAW_MODE else cached.to_image()
         else:
-            img = img.point(lambda x: 0 if x < THRESHOLD else 255, '1')
+            with job_metrics.stage("parse"):
+                img = _open_image(source)
+                img.load()
+            img = prepare_image(
+                img,
+                scale_width_percentage=scale_width_percentage,
+                target_width_mm=target_width_mm,
+                target_height_mm=target_height_mm,
+                dither_algorithm=dither_algorithm,
+                threshold=threshold
+            )
+            raster = pil_to_escpos_raster(img)
+            if cache is not None:
+                cache.put(key, img.width, img.height, raster)
 
         # ---------------------------
         # ALIGNMENT
@@ -201,11 +643,8 @@ def core_print_image(
         # ---------------------------
         # PRINT
         # ---------------------------
-        if USE_RAW_MODE:
-            raster = pil_to_escpos_raster(img)
-            printer._raw(raster)
-        else:
-            printer.image(img, impl='bitImageRaster')
+        saved = send_raster_image(printer, img, USE_RAW_MODE, raster=raster)
+        _log_blank_rows(saved)
 
         return True
 
@@ -225,7 +664,11 @@ def print_image_cmd(
     align="left",
     spacing=0,
     printer=None,
-    raw=False
+    raw=False,
+    use_cache=True,
+    band_rows=None,
+    dither=None,
+    threshold=None
 ):
     """
     Entry point used by markdown renderer.
@@ -239,9 +682,11 @@ def print_image_cmd(
     if printer is None:
         printer = printer_utils.find_printer(verbose=False)
 
-    # normalize paths
+    # normalize paths (in-memory images are a single input)
     if isinstance(image_paths, str):
         image_paths = image_paths.split("|")
+    elif isinstance(image_paths, (bytes, bytearray, Image.Image)):
+        image_paths = [image_paths]
 
     try:
         # ---- isolate from previous text ----
@@ -257,6 +702,10 @@ def print_image_cmd(
                 align_param=align,
                 printer=printer,
                 raw_mode=raw,
+                use_cache=use_cache,
+                band_rows=band_rows,
+                dither_algorithm=dither,
+                threshold=threshold,
             )
         else:
             core_print_image(
@@ -266,7 +715,11 @@ def print_image_cmd(
                 target_height_mm=height_mm,
                 align_param=align,
                 printer=printer,
-                raw_mode=raw,  
+                raw_mode=raw,
+                use_cache=use_cache,
+                band_rows=band_rows,
+                dither_algorithm=dither,
+                threshold=threshold,
             )
 
         # ---- isolate after image ----
@@ -291,6 +744,10 @@ def main(argv=None):
         action="store_true",
         help="Enable raw ESC/POS raster mode"
     )
+    parser.add_argument( "--no-cache", action="store_true", help="Do not read or write the prepared raster cache")
+    parser.add_argument( "--band-rows", type=int, help="Process and send tall images in bands of N rows")
+    parser.add_argument( "--dither", choices=dither.ALGORITHMS, help=f"1-bit conversion (default: {DITHER_ALGORITHM})")
+    parser.add_argument( "--threshold", type=int, help=f"Level for --dither threshold (default: {THRESHOLD})")
     
     args = parser.parse_args(argv)
 
@@ -301,5 +758,9 @@ def main(argv=None):
         height_mm=args.height_mm,
         align=args.align,
         spacing=args.spacing,
-        raw=args.raw
+        raw=args.raw,
+        use_cache=not args.no_cache,
+        band_rows=args.band_rows,
+        dither=args.dither,
+        threshold=args.threshold
     )
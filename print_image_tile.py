@@ -1,14 +1,23 @@
 import argparse
+import io
 import math
 import os
-from PIL import Image
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageChops, ImageOps
 import printer_utils
+import job_metrics
+from print_image import pil_to_escpos_raster, send_raster_image
 
 PRINTER_DPI = printer_utils.PRINTER_DPI
 PRINTER_MAX_WIDTH_MM = 72.0
 
 TEMP_DIR = "./tile_debug"
 
+PIPELINE_WORKERS = 2    # threads cropping/dithering/packing tiles
+PIPELINE_DEPTH = 4      # prepared tiles waiting for the writer
+
 
 # ---------------------------
 # Helpers
@@ -23,7 +32,12 @@ def px_to_mm(px):
 
 
 def _open(path):
-    return Image.open(path).convert("RGB")
+    if isinstance(path, Image.Image):
+        return path.convert("RGB")
+    if isinstance(path, (bytes, bytearray)):
+        path = io.BytesIO(path)
+    with job_metrics.stage("parse"):
+        return Image.open(path).convert("RGB")
 
 
 def _ensure_temp():
@@ -42,6 +56,7 @@ def print_image_tile(
     align="left",
     save_debug=True,
     printer=None,
+    raw=False,
 ):
 
     if printer is None:
@@ -103,44 +118,95 @@ def print_image_tile(
         print(f"[DEBUG] scaled={img.size}")
 
     # ----------------------------------------------------
-    # TILE GENERATION (2D GRID)
+    # TILE PIPELINE (2D GRID)
+    # workers crop/dither/pack -> bounded queue -> writer
     # ----------------------------------------------------
-    tiles = []
+    img.load()  # decode once before worker threads share it
 
+    boxes = []
     for y in range(y_segments):
         for x in range(x_segments):
 
             x0 = x * max_width_px
             y0 = y * segment_px
 
-            tile = img.crop((
+            boxes.append(((y, x), (
                 x0,
                 y0,
                 min(x0 + max_width_px, img.width),
                 min(y0 + segment_px, img.height)
-            ))
-
-            tiles.append(tile)
+            )))
 
-            if save_debug:
-                tile.save(f"{TEMP_DIR}/tile_{y}_{x}.png")
+    print(f"[DEBUG] tiles={len(boxes)}")
 
-    print(f"[DEBUG] tiles={len(tiles)}")
-
-    # ----------------------------------------------------
-    # PRINT
-    # ----------------------------------------------------
     printer.set(align=(align or "left").lower())
 
-    for t in tiles:
-
-        printer.image(t)
+    pending = queue.Queue(maxsize=PIPELINE_DEPTH)
+    failure = []
 
-        if cut:
+    def write():
+        while True:
+            fut = pending.get()
+            if fut is None:
+                return
+            if failure:
+                continue  # drain after an error
             try:
-                printer.cut()
-            except Exception:
-                printer._raw(b'\x1d\x56\x00')
+                tile, raster = fut.result()
+
+                send_raster_image(printer, tile, raw, raster=raster)
+
+                if cut:
+                    try:
+                        printer.cut()
+                    except Exception:
+                        printer._raw(b'\x1d\x56\x00')
+
+                printer_utils.flush(printer)
+            except Exception as e:
+                failure.append(e)
+
+    writer = threading.Thread(target=job_metrics.carry(write), name="tile-writer", daemon=True)
+    writer.start()
+
+    workers = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="tile")
+    debug_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile-debug") if save_debug else None
+
+    try:
+        for (y, x), box in boxes:
+            if failure:
+                break
+            if debug_writer:
+                debug_writer.submit(_save_debug_tile, img, box, f"{TEMP_DIR}/tile_{y}_{x}.png")
+            pending.put(workers.submit(job_metrics.carry(_prepare_tile), img, box, raw))
+    finally:
+        pending.put(None)
+        writer.join()
+        workers.shutdown(wait=True)
+        if debug_writer:
+            debug_writer.shutdown(wait=True)
+
+    if failure:
+        raise failure[0]
+
+
+def _prepare_tile(img, box, raw):
+    """
+    Crop + 1-bit conversion + GS v 0 packing, run in a worker.
+    python-escpos dithers the inverted grayscale image; doing the same here
+    keeps printer.image(tile) byte-identical to passing it the RGB crop.
+    """
+    with job_metrics.stage("preprocess"):
+        tile = img.crop(box).convert("L")
+        tile = ImageChops.invert(ImageOps.invert(tile).convert("1"))
+    return tile, pil_to_escpos_raster(tile)
+
+
+def _save_debug_tile(img, box, path):
+    try:
+        img.crop(box).save(path)
+    except Exception as e:
+        print(f"[DEBUG] could not save {path}: {e}")
 
 
 # ---------------------------
@@ -155,6 +221,11 @@ def main(argv=None):
 
     parser.add_argument("-m", "--mode", choices=["v", "h"], default="v")
     parser.add_argument("-c", "--cut", action="store_true")
+    parser.add_argument(
+        "-r", "--raw",
+        action="store_true",
+        help="Enable raw ESC/POS raster mode"
+    )
 
     args = parser.parse_args(argv)
 
@@ -163,6 +234,7 @@ def main(argv=None):
         segment_length_mm=args.segment_length_mm,
         mode=args.mode,
         cut=args.cut,
+        raw=args.raw,
     )
 
 
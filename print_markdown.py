@@ -1,10 +1,10 @@
 import sys
 import textwrap
 import printer_utils
+import job_metrics
 from printer_utils import send_raw
 import ftfy
 import re
-from print_image import print_image_cmd
 from print_text import encode_and_send_line
 
 from marko import Markdown
@@ -341,7 +341,6 @@ class AstPrinter:
         elif t == "Paragraph":
             
             import re
-            from print_image import print_image_cmd
             import printer_utils
 
             pattern = re.compile(r'\[print_image:([^\]]+)\]')
@@ -366,7 +365,9 @@ class AstPrinter:
 
                         self.p.newline(1)
                         printer_utils.reset_formatting(self.p.printer)
-                        
+
+                        # PIL is only loaded for documents with images
+                        from print_image import print_image_cmd
                         print_image_cmd(
                             img_paths,
                             printer=self.p.printer,
@@ -375,6 +376,7 @@ class AstPrinter:
                         
                         printer_utils.reset_formatting(self.p.printer)
                         self.p.printer._raw(b'\x1b\x40')  # ESC @ full reset
+                        printer_utils.forget_codepage(self.p.printer)
                         self.p.printer.text("\n")
                         self.p.newline(2)
 
@@ -684,6 +686,12 @@ class AstPrinter:
                 kwargs["height_mm"] = float(o.split("=")[1])
             elif o.startswith("spacing="):
                 kwargs["spacing"] = int(o.split("=")[1])
+            elif o.startswith("band_rows="):
+                kwargs["band_rows"] = int(o.split("=")[1])
+            elif o.startswith("dither="):
+                kwargs["dither"] = o.split("=")[1]
+            elif o.startswith("threshold="):
+                kwargs["threshold"] = int(o.split("=")[1])
 
         return img_paths, kwargs
 
@@ -694,8 +702,9 @@ class AstPrinter:
 def render_markdown(md_text):
     printer = EscPosPrinter()
     renderer = AstPrinter(printer)
-    md = Markdown(extensions=[GFM])
-    ast = md.parse(md_text)
+    with job_metrics.stage("parse"):
+        md = Markdown(extensions=[GFM])
+        ast = md.parse(md_text)
     renderer.render(ast)
     printer.close()
 
@@ -728,6 +737,9 @@ def main(args=None):
           width_mm=<num>  - Target physical width in millimeters")
           height_mm=<num> - Target physical height in millimeters")
           align=<left|center|right> - Alignment of the image")
+          band_rows=<num> - Stream tall images in bands of num rows
+          dither=<pil|threshold|otsu|bayer4|bayer8|floyd-steinberg|atkinson>
+          threshold=<0-255> - Level for dither=threshold
         
         Example: [print_image:logo.png scale=80 align=center]
         
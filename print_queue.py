@@ -0,0 +1,172 @@
+# print_queue.py — single-worker print job queue
+#
+# The worker thread is the only code that touches the printer, so concurrent
+# submitters (HTTP requests, sockets) never share the USB device. While the
+# status monitor (printer_utils.start_status_monitor) reports the printer
+# stalled, the worker holds the next job back instead of starting it.
+
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+import printer_utils
+
+QUEUE_MAX_DEPTH = 16        # queued (not yet printing) jobs before submit() refuses
+JOB_HISTORY = 500           # finished jobs kept for status lookups
+PAUSE_LOG_SECONDS = 60      # while paused, log a reminder this often
+
+
+class QueueFull(Exception):
+    pass
+
+
+class PrintJob:
+    def __init__(self, func, mode=None, cleanup=None):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.printer = None         # pool member name (printer_pool)
+        self.status = "queued"      # queued -> printing -> done | failed
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+        self._func = func
+        self._cleanup = cleanup
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "mode": self.mode,
+            "printer": self.printer,
+            "status": self.status,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class PrintQueue:
+    def __init__(self, max_depth=QUEUE_MAX_DEPTH, history=JOB_HISTORY, name="print-worker",
+                 pause_when_stalled=True, monitor=None):
+        self.max_depth = max_depth
+        self.history = history
+        self.name = name
+        self.pause_when_stalled = pause_when_stalled
+        self.monitor = monitor      # StatusMonitor to obey; None = printer_utils' own
+        self.paused = False
+
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    # ---------------------------
+    # Submitting
+    # ---------------------------
+
+    def submit(self, func, mode=None, cleanup=None):
+        """
+        Queue func() for the worker and return its PrintJob immediately.
+        Raises QueueFull when max_depth jobs are already waiting.
+        """
+        job = PrintJob(func, mode=mode, cleanup=cleanup)
+
+        with self._lock:
+            self._ensure_worker()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFull(f"Print queue is full ({self.max_depth} jobs waiting)")
+            self._jobs[job.id] = job
+            self._trim_history()
+
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    # ---------------------------
+    # Worker
+    # ---------------------------
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if self.pause_when_stalled:
+                    self._wait_printer()
+                self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    def _wait_printer(self):
+        if self.monitor is not None:
+            wait_ready, status = self.monitor.wait_ready, self.monitor.status
+        else:
+            wait_ready, status = printer_utils.wait_until_ready, printer_utils.printer_status
+
+        if wait_ready(timeout=0):
+            return
+        self.paused = True
+        try:
+            while True:
+                printer_utils.logger.warning(
+                    f"prt - {self.name} paused: printer {status()['state']}, {self.depth() + 1} job(s) waiting"
+                )
+                if wait_ready(timeout=PAUSE_LOG_SECONDS):
+                    break
+        finally:
+            self.paused = False
+        printer_utils.logger.info(f"prt - printer ready, {self.name} resumed")
+
+    def _execute(self, job):
+        job.status = "printing"
+        job.started = time.time()
+        try:
+            job.result = job._func()
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            printer_utils.logger.error(f"prt - job {job.id} failed: {e}\n{traceback.format_exc()}")
+        finally:
+            job.finished = time.time()
+            if job._cleanup:
+                try:
+                    job._cleanup()
+                except Exception:
+                    pass
+            job._func = None
+            job._cleanup = None
+            job._done.set()
+
+    def _trim_history(self):
+        # Drop the oldest finished jobs, never ones still waiting or printing
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].finished is not None:
+                del self._jobs[job_id]
+                excess -= 1
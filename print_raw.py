@@ -2,11 +2,26 @@
 import sys
 import printer_utils
 
-def print_raw(cut=False):
+CHUNK_SIZE = 64 * 1024
+
+def print_raw(cut=False, data=None, path=None):
+    """
+    Send data, or the file at path in CHUNK_SIZE pieces (large spooled
+    uploads never sit in memory whole), or stdin.
+    """
     printer = printer_utils.find_printer()
-    data = sys.stdin.buffer.read()
-    if data:
-        printer._raw(data)
+    if path is not None:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                printer._raw(chunk)
+    else:
+        if data is None:
+            data = sys.stdin.buffer.read()
+        if data:
+            printer._raw(data)
     if cut:
         printer.cut()
     printer.close()
@@ -14,6 +29,7 @@ def print_raw(cut=False):
 def main(args=None):
     import argparse
     parser = argparse.ArgumentParser(description="Send raw ESC/POS bytes to printer.")
+    parser.add_argument("file", nargs="?", help="File with ESC/POS bytes, e.g. from print.py --compile (defaults to stdin)")
     parser.add_argument("-c", "--cut", action="store_true")
     parsed = parser.parse_args(args)
-    print_raw(parsed.cut)
+    print_raw(parsed.cut, path=parsed.file)
@@ -5,6 +5,7 @@ import textwrap
 import ftfy
 import time
 import printer_utils
+import codepage_index
 from itertools import cycle
 
 sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
@@ -35,70 +36,60 @@ def print_buffer(printer, lines):
             printer.text(wrapped + "\n")
 
 # ESC/POS codepage candidates
-codepage_candidates = [
-    (16, "cp1252", "Western Europe + €"),
-    (2, "cp850", "Western Europe"),
-    (18, "cp852", "Polish / Central Europe"),
-    (5, "cp865", "Nordic"),
-    (17, "cp866", "Cyrillic / Russian"),
-    (0, "cp437", "Box-drawing / Graphics"),
-]
+codepage_candidates = codepage_index.CODEPAGE_CANDIDATES
+
+def send_codepage_runs(printer, text):
+    """
+    Sends text split into runs of codepages with the fewest ESC t switches.
+    Characters no candidate codepage has are printed as '?'.
+    """
+    current = getattr(printer, "_codepage", None)
+    for n, codec, run in codepage_index.split_runs(text, current):
+        printer_utils.select_codepage(printer, n)
+        printer._raw(run.encode(codec))
 
 def encode_and_send_line(printer, text):
     """
-    Sends one line using best-fit ESC/POS codepage.
+    Sends one line using best-fit ESC/POS codepage(s).
     This is the single source of truth for markdown
     """
     text = ftfy.fix_text(text)
 
-    for n, codec, _ in codepage_candidates:
-        try:
-            printer._raw(b"\x1B\x74" + bytes([n]))
-            printer._raw(text.encode(codec))
-            return True
-        except UnicodeEncodeError:
-            continue
+    if all(codepage_index.char_mask(ch) for ch in text):
+        send_codepage_runs(printer, text)
+        return True
 
-    # fallback
+    # fallback: let python-escpos look beyond our candidates
     printer.text(text)
     return False
 
-def print_text_simple(cut=False):
+def print_text_simple(cut=False, lines=None):
     printer = get_printer()
     
 
-    def find_compatible_codepage(text):
-        for n, codec, desc in codepage_candidates:
-            try:
-                text.encode(codec)
-                return n, codec, desc
-            except UnicodeEncodeError:
-                continue
-        return None, None, None
-
     printer._raw(b"\n") # Prepend new line to solve first line borking.
 
-    for line in sys.stdin:
+    for line in (sys.stdin if lines is None else lines):
         line = line.rstrip()
         wrapped_lines = textwrap.wrap(line, width=PRINTER_CHAR_WIDTH) if len(line) > PRINTER_CHAR_WIDTH else [line]
 
         for wl in wrapped_lines:
-            n, codec, desc = find_compatible_codepage(wl)
-            if n is None:
-                # fallback: replace unprintable characters
-                encoded_line = wl.encode("ascii", errors="replace")
-                printer.text("\n" + encoded_line.decode("ascii"))
-            else:
-                # switch ESC/POS code page per line
-                printer._raw(b"\x1B\x74" + bytes([n]))
-                encoded_line = wl.encode(codec)
-                printer._raw(encoded_line + b"\n")
+            # mixed-script lines are split over codepages, '?' for the rest
+            send_codepage_runs(printer, wl)
+            printer._raw(b"\n")
 
     if cut:
         printer.cut()
     printer.close()
 
-def print_text_buffered(cut=False):
+def print_text_buffered(cut=False, lines=None, keep_open=False):
+    """
+    Print lines in batches of FLUSH_LINES, or whatever arrived within
+    FLUSH_INTERVAL. By default the printer is closed after each batch (a
+    terminal stream does not hold the device); keep_open keeps one session
+    for the whole stream and only flushes (server streams, no spinner).
+    A line iterator may yield "" to let the interval flush run while idle.
+    """
     printer_container = [get_printer(stream_mode=True)]
     buffer, last_flush = [], time.time()
 
@@ -108,12 +99,15 @@ def print_text_buffered(cut=False):
             print_buffer(printer_container[0], buffer)
             buffer.clear()
             last_flush = time.time()
+            if keep_open:
+                printer_utils.flush(printer_container[0])
+                return
             printer_container[0].close()
             printer_container[0] = get_printer(stream_mode=True)
             spinner_print()
 
     try:
-        for line in sys.stdin:
+        for line in (sys.stdin if lines is None else lines):
             if line.strip():
                 buffer.append(line)
             now = time.time()
@@ -132,6 +126,20 @@ def print_text_buffered(cut=False):
     printer_container[0].close()
 
 
+def print_string(text, cut=False, stream=False, keep_open=False):
+    """
+    Print an in-memory str (or UTF-8 bytes) without going through stdin.
+    Any other iterable is taken as lines as they arrive (a live stream).
+    """
+    if isinstance(text, (bytes, bytearray)):
+        text = bytes(text).decode("utf-8", errors="replace")
+    lines = text.splitlines() if isinstance(text, str) else text
+    if stream:
+        print_text_buffered(cut, lines=lines, keep_open=keep_open)
+    else:
+        print_text_simple(cut, lines=lines)
+
+
 def main(args=None):
     import argparse
     import os
@@ -148,11 +156,10 @@ def main(args=None):
             print(f"Error: file not found: {parsed.file}", file=sys.stderr)
             sys.exit(1)
         with open(parsed.file, "r", encoding="utf-8", errors="replace") as f:
-            sys.stdin = f  # redirect file to stdin
             if parsed.stream:
-                print_text_buffered(parsed.cut)
+                print_text_buffered(parsed.cut, lines=f)
             else:
-                print_text_simple(parsed.cut)
+                print_text_simple(parsed.cut, lines=f)
     else:
         # No file → read from stdin directly
         if parsed.stream:
@@ -0,0 +1,209 @@
+# printer_pool.py — several identical printers, one session + worker each
+#
+# Every printer matching PRINTER_VENDOR_ID / PRINTER_PRODUCT_ID gets its own
+# PrinterSession, PrintQueue worker and (optionally) StatusMonitor. A job
+# goes to an explicit target, or to the printer with the least paper queued,
+# so throughput grows with the number of printers:
+#
+#   pool = PrinterPool.discover()
+#   job = pool.submit(lambda: print_module.core_print(mode="text", data=text),
+#                     mode="text", paper_mm=estimate_paper_mm("text", text))
+
+import io
+import threading
+
+import printer_utils
+import print_queue
+
+DEFAULT_JOB_MM = 100.0          # paper assumed for a job that cannot be estimated
+LINE_MM = 30 / (printer_utils.PRINTER_DPI / 25.4)   # 24-dot font + default spacing
+
+
+class PoolMember:
+    def __init__(self, session, max_depth=print_queue.QUEUE_MAX_DEPTH, status_interval=printer_utils.STATUS_INTERVAL):
+        self.session = session
+        self.name = session.name
+        self.monitor = printer_utils.StatusMonitor(status_interval, session=session) if status_interval else None
+        self.queue = print_queue.PrintQueue(
+            max_depth=max_depth,
+            name=f"print-worker-{self.name}",
+            pause_when_stalled=self.monitor is not None,
+            monitor=self.monitor
+        )
+        self.queued_mm = 0.0    # estimated paper of jobs waiting or printing here
+        self.streams = 0        # open-ended stream jobs waiting or printing here
+        self.jobs = 0
+        self._lock = threading.Lock()
+
+    def stalled(self):
+        return self.monitor is not None and self.monitor.stalled()
+
+    def status(self):
+        return {
+            "name": self.name,
+            "queued_mm": round(self.queued_mm, 1),
+            "streams": self.streams,
+            "depth": self.queue.depth(),
+            "paused": self.queue.paused,
+            "jobs": self.jobs,
+            "status": self.monitor.status() if self.monitor else {"state": "unmonitored"},
+        }
+
+
+class PrinterPool:
+    def __init__(self, sessions, max_depth=print_queue.QUEUE_MAX_DEPTH, status_interval=printer_utils.STATUS_INTERVAL):
+        if not sessions:
+            raise printer_utils.PrinterError("Printer pool needs at least one printer.")
+        self.members = {
+            session.name: PoolMember(session, max_depth, status_interval)
+            for session in sessions
+        }
+
+    @classmethod
+    def discover(cls, verbose=True, **kwargs):
+        """
+        Pool of every connected printer (see printer_utils.discover_printers).
+        """
+        printers = printer_utils.discover_printers(verbose=verbose)
+        if not printers:
+            raise printer_utils.PrinterError("No matching USB printer found.")
+        return cls([printer_utils.usb_session(name, identity) for name, identity in printers.items()], **kwargs)
+
+    def start_monitors(self):
+        for member in self.members.values():
+            if member.monitor is not None:
+                member.monitor.start()
+
+    # ---------------------------
+    # Submitting
+    # ---------------------------
+
+    def submit(self, func, mode=None, cleanup=None, paper_mm=None, target=None, stream=False):
+        """
+        Queue func() on one printer and return its PrintJob (job.printer is
+        the member's name). target picks the printer by name; otherwise the
+        least loaded one that is not stalled. Raises KeyError for an unknown
+        target and print_queue.QueueFull when no candidate has room.
+
+        stream marks a job of unknown, unbounded length (live text): while
+        it is queued or printing, its printer only gets jobs routed to it
+        when every other printer is streaming too.
+        """
+        if paper_mm is None:
+            paper_mm = 0.0 if stream else DEFAULT_JOB_MM
+
+        if target is not None:
+            if target not in self.members:
+                raise KeyError(f"Unknown printer {target!r} (pool: {', '.join(self.members)})")
+            candidates = [self.members[target]]
+        else:
+            candidates = self._ranked()
+
+        full = None
+        for member in candidates:
+            try:
+                return self._submit_to(member, func, mode, cleanup, paper_mm, stream)
+            except print_queue.QueueFull as e:
+                full = e
+        raise full
+
+    def _ranked(self):
+        # least paper first, streaming then stalled printers last; ties by queue depth
+        with_load = []
+        for member in self.members.values():
+            with member._lock:
+                load = member.queued_mm
+                streaming = member.streams > 0
+            with_load.append((member.stalled(), streaming, load, member.queue.depth(), member.name, member))
+        return [entry[-1] for entry in sorted(with_load, key=lambda e: e[:5])]
+
+    def _submit_to(self, member, func, mode, cleanup, paper_mm, stream=False):
+        session = member.session
+        streams = 1 if stream else 0
+
+        def run():
+            with printer_utils.use_session(session):
+                return func()
+
+        def done():
+            with member._lock:
+                member.queued_mm -= paper_mm
+                member.streams -= streams
+            if cleanup:
+                cleanup()
+
+        with member._lock:
+            member.queued_mm += paper_mm
+            member.streams += streams
+        try:
+            job = member.queue.submit(run, mode=mode, cleanup=done)
+        except print_queue.QueueFull:
+            with member._lock:
+                member.queued_mm -= paper_mm
+                member.streams -= streams
+            raise
+
+        job.printer = member.name
+        member.jobs += 1
+        return job
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+
+    def get(self, job_id):
+        for member in self.members.values():
+            job = member.queue.get(job_id)
+            if job is not None:
+                return job
+        return None
+
+    def depth(self):
+        return sum(member.queue.depth() for member in self.members.values())
+
+    def status(self):
+        return [member.status() for member in self.members.values()]
+
+    def close(self):
+        for member in self.members.values():
+            if member.monitor is not None:
+                member.monitor.stop()
+            member.session.reset(verbose=False)
+
+
+# ---------------------------
+# Paper estimates (routing weight)
+# ---------------------------
+
+def estimate_paper_mm(mode, data=None, path=None):
+    """
+    Rough paper length of a job from its input (data, or a file read in
+    chunks), DEFAULT_JOB_MM if unknown.
+    """
+    try:
+        if mode == "text":
+            if path is not None:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    return _text_lines(f) * LINE_MM
+            text = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+            return _text_lines(text.splitlines()) * LINE_MM
+
+        if mode == "image":
+            from PIL import Image
+            import print_image
+            with Image.open(path if path is not None else io.BytesIO(data)) as img:    # header only
+                w, h = img.size
+            size = print_image.target_size(w, h)
+            return (size[1] if size else h) / (printer_utils.PRINTER_DPI / 25.4)
+
+        if mode == "raw":
+            import printer_sim
+            return printer_sim.paper_mm(data=data, path=path)
+    except Exception:
+        pass
+    return DEFAULT_JOB_MM
+
+
+def _text_lines(lines):
+    width = printer_utils.PRINTER_CHAR_WIDTH
+    return sum(max(1, -(-len(line.rstrip("\n")) // width)) for line in lines)
@@ -0,0 +1,301 @@
+# printer_sim.py — stand-in printer with a USB / buffer / paper-feed time model
+#
+# Swapped in behind printer_utils.find_printer() so jobs can be profiled and
+# load-tested without the 0416:5011 device:
+#
+#   host --(USB, bytes/s)--> receive buffer (bytes) --> print engine (mm/s)
+#
+# A write returns once its last byte is in the receive buffer, so a full
+# buffer pushes back on the host exactly like the real device. Only paper
+# motion takes engine time: raster rows, line feeds, ESC J / ESC d and cuts.
+
+import json
+import time
+import threading
+from collections import deque
+
+from escpos.printer import Dummy
+
+import printer_utils
+
+USB_BYTES_PER_S = 1_000_000      # USB full speed bulk, practical
+RECEIVE_BUFFER_BYTES = 4096
+FEED_MM_PER_S = 90.0
+DOTS_PER_MM = printer_utils.PRINTER_DPI / 25.4
+LINE_HEIGHT_DOTS = 30            # 24-dot font + default spacing
+CUT_SECONDS = 0.5
+CHUNK_BYTES = 512                # granularity of the simulation
+
+
+class SimulatedPrinter(Dummy):
+    """
+    python-escpos printer that records output and simulates device timing.
+
+    realtime=True sleeps while the device would block the host (for
+    end-to-end latency tests of the server). Otherwise the blocked time is
+    added to a virtual clock and nothing sleeps, so CI stays fast.
+    """
+
+    def __init__(self,
+                 usb_bytes_per_s=USB_BYTES_PER_S,
+                 buffer_bytes=RECEIVE_BUFFER_BYTES,
+                 feed_mm_per_s=FEED_MM_PER_S,
+                 realtime=False,
+                 keep_output=True):
+        super().__init__()
+        self.usb_bytes_per_s = usb_bytes_per_s
+        self.buffer_bytes = buffer_bytes
+        self.feed_mm_per_s = feed_mm_per_s
+        self.realtime = realtime
+        self.keep_output = keep_output
+
+        # answered to DLE EOT 1/2/4; flip to test the status monitor
+        self.paper_out = False
+        self.cover_open = False
+        self._replies = deque()
+
+        self._lock = threading.Lock()
+        self.reset_clock()
+
+    # ---------------------------
+    # Clock
+    # ---------------------------
+
+    def reset_clock(self):
+        self._start = time.perf_counter()
+        self._offset = 0.0          # simulated blocking not actually slept
+        self._link_free = 0.0
+        self._engine_free = 0.0
+        self._in_buffer = deque()   # (engine finish time, bytes)
+        self._buffered = 0
+        self._scan = _MotionScanner()
+
+        self.bytes_received = 0
+        self.writes = 0
+        self.stall_seconds = 0.0
+        self.paper_mm = 0.0
+        self.timeline = []          # (t, bytes received so far, paper mm done)
+
+    def now(self):
+        return time.perf_counter() - self._start + self._offset
+
+    # ---------------------------
+    # Device
+    # ---------------------------
+
+    def _raw(self, msg):
+        msg = bytes(msg)
+        with self._lock:
+            if self.keep_output:
+                self._output_list.append(msg)
+            t = self.now()
+            done = self._accept(msg, t)
+            if len(msg) == 3 and msg[:2] == b"\x10\x04":
+                self._replies.append(self._status_reply(msg[2]))
+
+            wait = done - t
+            if wait > 0:
+                self.stall_seconds += wait
+                if self.realtime:
+                    time.sleep(wait)
+                else:
+                    self._offset += wait
+
+    def _accept(self, msg, t):
+        """
+        Move msg over the link into the buffer; return when the last byte
+        is in.
+        """
+        self.writes += 1
+        arrival = t
+        for i in range(0, len(msg), CHUNK_BYTES):
+            chunk = msg[i:i + CHUNK_BYTES]
+            size = len(chunk)
+
+            start = max(t, self._link_free)
+
+            # Backpressure: wait for the engine to free buffer space
+            while self._in_buffer and self._buffered + size > self.buffer_bytes:
+                finish, freed = self._in_buffer.popleft()
+                self._buffered -= freed
+                start = max(start, finish)
+            while self._in_buffer and self._in_buffer[0][0] <= start:
+                self._buffered -= self._in_buffer.popleft()[1]
+
+            arrival = start + size / self.usb_bytes_per_s
+            self._link_free = arrival
+
+            mm, extra_s = self._scan.feed(chunk)
+            engine_start = max(arrival, self._engine_free)
+            finish = engine_start + mm / self.feed_mm_per_s + extra_s
+            self._engine_free = finish
+
+            self._in_buffer.append((finish, size))
+            self._buffered += size
+            self.bytes_received += size
+            self.paper_mm += mm
+            self.timeline.append((round(arrival, 6), self.bytes_received, round(self.paper_mm, 3)))
+        return arrival
+
+    def _status_reply(self, n):
+        status = 0x12
+        stalled = self.paper_out or self.cover_open
+        if n == 1 and stalled:
+            status |= 0x08
+        elif n == 2:
+            status |= (0x04 if self.cover_open else 0) | (0x20 if self.paper_out else 0)
+        elif n == 4 and self.paper_out:
+            status |= 0x6C
+        return bytes([status])
+
+    def _read(self):
+        with self._lock:
+            return self._replies.popleft() if self._replies else b""
+
+    # ---------------------------
+    # Reporting
+    # ---------------------------
+
+    def stats(self):
+        host_s = self._link_free
+        done_s = max(self._engine_free, host_s)
+        return {
+            "bytes": self.bytes_received,
+            "writes": self.writes,
+            "paper_mm": round(self.paper_mm, 2),
+            "host_seconds": round(host_s, 4),
+            "printed_seconds": round(done_s, 4),
+            "stall_seconds": round(self.stall_seconds, 4),
+            "throughput_bytes_per_s": round(self.bytes_received / host_s) if host_s else 0,
+        }
+
+    def save_timeline(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"stats": self.stats(), "timeline": self.timeline}, f)
+
+
+class _MotionScanner:
+    """
+    Minimal, stateful ESC/POS scanner: how much paper a byte stream moves.
+    Commands may be split across writes. Unknown ESC/GS commands are taken
+    as two bytes, which is enough for a timing model.
+    """
+
+    # command prefix -> total length (including prefix)
+    FIXED = {
+        b"\x1b@": 2, b"\x1bt": 3, b"\x1ba": 3, b"\x1bE": 3, b"\x1b-": 3,
+        b"\x1b{": 3, b"\x1b!": 3, b"\x1bM": 3, b"\x1bG": 3, b"\x1b2": 2,
+        b"\x1b3": 3, b"\x1bJ": 3, b"\x1bd": 3, b"\x1dB": 3, b"\x1d!": 3,
+        b"\x1dh": 3, b"\x1dw": 3, b"\x1dH": 3, b"\x1df": 3, b"\x1dL": 4,
+        b"\x1dW": 4, b"\x10\x04": 3,
+    }
+
+    def __init__(self):
+        self.pending = b""
+        self.raster_left = 0
+        self.raster_row_bytes = 1
+        self.line_dots = LINE_HEIGHT_DOTS
+
+    def feed(self, data):
+        """
+        Returns (paper mm, extra seconds) caused by data.
+        """
+        data = self.pending + data
+        self.pending = b""
+        dots = 0.0
+        extra = 0.0
+        i = 0
+        n = len(data)
+
+        while i < n:
+            if self.raster_left:
+                k = min(self.raster_left, n - i)
+                self.raster_left -= k
+                dots += k / self.raster_row_bytes
+                i += k
+                continue
+
+            b = data[i]
+            if b == 0x0A:
+                dots += self.line_dots
+                i += 1
+                continue
+            if b not in (0x1B, 0x1D, 0x10):
+                i += 1
+                continue
+
+            if n - i < 2:
+                break
+            prefix = data[i:i + 2]
+
+            if prefix == b"\x1dv":             # GS v 0 m xL xH yL yH
+                if n - i < 8:
+                    break
+                row_bytes = data[i + 4] | (data[i + 5] << 8)
+                rows = data[i + 6] | (data[i + 7] << 8)
+                self.raster_row_bytes = max(1, row_bytes)
+                self.raster_left = row_bytes * rows
+                i += 8
+                continue
+
+            if prefix == b"\x1dV":             # GS V m [n]
+                if n - i < 3:
+                    break
+                length = 4 if data[i + 2] in (65, 66, 97, 98) else 3
+                if n - i < length:
+                    break
+                extra += CUT_SECONDS
+                i += length
+                continue
+
+            length = self.FIXED.get(prefix, 2)
+            if n - i < length:
+                break
+            if prefix == b"\x1bJ":
+                dots += data[i + 2]
+            elif prefix == b"\x1bd":
+                dots += data[i + 2] * self.line_dots
+            elif prefix == b"\x1b3":
+                self.line_dots = data[i + 2]
+            elif prefix == b"\x1b2":
+                self.line_dots = LINE_HEIGHT_DOTS
+            i += length
+
+        self.pending = data[i:]
+        return dots / DOTS_PER_MM, extra
+
+
+def paper_mm(data=None, path=None):
+    """
+    Millimetres of paper an ESC/POS byte stream (data, or a file read in
+    chunks) moves.
+    """
+    scanner = _MotionScanner()
+    if path is None:
+        return scanner.feed(bytes(data))[0]
+    mm = 0.0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            mm += scanner.feed(chunk)[0]
+    return mm
+
+
+def simulator_sessions(count, **kwargs):
+    """
+    count PrinterSessions ("sim0", "sim1", ...) on their own
+    SimulatedPrinter each, for printer_pool.PrinterPool.
+    """
+    sessions = []
+    for i in range(count):
+        sim = SimulatedPrinter(**kwargs)
+        sessions.append(printer_utils.PrinterSession(f"sim{i}", lambda sim=sim: sim))
+    return sessions
+
+
+def use_simulator(**kwargs):
+    """
+    Route printer_utils.find_printer() to one SimulatedPrinter and return it.
+    """
+    sim = SimulatedPrinter(**kwargs)
+    printer_utils.set_backend(lambda: sim)
+    return sim
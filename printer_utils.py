@@ -1,9 +1,17 @@
 import usb.backend.libusb1
 import usb.core
 import usb.util
+import os
 import logging
+import atexit
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 
-from escpos.printer import Usb
+import job_metrics
+
+from escpos.printer import Usb, Dummy
 
 
 PRINTER_VENDOR_ID = 0x0416
@@ -12,8 +20,37 @@ PRINTER_CHAR_WIDTH = 48
 PRINTER_WIDTH_PX = 640
 PRINTER_DPI = 203  # Usually 203 DPI = 8 dots/mm
 
+# Output is coalesced and sent once this many bytes are pending (0 disables)
+WRITE_BUFFER_SIZE = 16 * 1024
+
+# Flow control: flushes go to the device in chunks, paced so the printer's
+# receive buffer is not overrun; a timed-out chunk is retried
+WRITE_CHUNK_SIZE = 4096             # 0 = one write per flush
+WRITE_TIMEOUT_MS = 2000             # per chunk (python-escpos default 0 = wait forever)
+WRITE_RETRIES = 3
+WRITE_PACING = os.getenv("THERMAL_WRITE_PACING", "drain")   # "drain", "status" or "off"
+PRINTER_BUFFER_BYTES = 4096         # receive buffer assumed by "drain" pacing
+STATUS_WAIT_SECONDS = 30            # "status": give up if offline this long
+STALL_SECONDS = 0.25                # a chunk write slower than this is a stall
+
+# Status monitor: DLE EOT polling while the printer is idle (0 disables)
+STATUS_INTERVAL = float(os.getenv("THERMAL_STATUS_INTERVAL", "2"))
+STATUS_READ_TIMEOUT_MS = 100
+
 
 _PRINTER = None
+_BACKEND = None     # callable returning a printer; None = USB discovery
+_IDENTITY = None    # where the last good USB connection was, see UsbIdentity
+_LIBUSB = False     # libusb1 backend, looked up once
+_CONNECT_LOCK = threading.RLock()   # find_printer / reset_printer vs. the status monitor
+_MONITOR = None
+_BOUND = threading.local()          # .session: PrinterSession of this thread (printer_pool)
+
+RECONNECT_HISTORY = 100     # latencies kept per path for reconnect_stats()
+_RECONNECTS = {
+    "fast": {"count": 0, "failures": 0, "ms": deque(maxlen=RECONNECT_HISTORY)},
+    "full": {"count": 0, "failures": 0, "ms": deque(maxlen=RECONNECT_HISTORY)},
+}
 
 logger = logger = logging.getLogger("uvicorn") 
 logger.setLevel(logging.INFO)
@@ -43,26 +80,346 @@ def _log(message, verbose, level="info"):
 def find_printer(verbose=True, stream_mode=False, force_refresh=False):
     """
     Returns cached printer or discovers it.
+    In a thread bound to a PrinterSession (see use_session), that
+    session's printer.
     """
 
     global _PRINTER
 
+    session = getattr(_BOUND, "session", None)
+    if session is not None:
+        if force_refresh:
+            session.reset(verbose=False)
+        return session.connect(verbose=verbose)
+
     if _PRINTER is not None and not force_refresh:
         return _PRINTER
 
-    printer = _discover_printer(verbose=verbose, stream_mode=stream_mode)
+    with _CONNECT_LOCK:
+        if _PRINTER is not None and not force_refresh:
+            return _PRINTER     # the status monitor connected meanwhile
 
+        if _BACKEND is not None:
+            printer = _BACKEND()
+        else:
+            printer = _connect_usb(verbose=verbose, stream_mode=stream_mode)
+
+        _PRINTER = _init_printer(printer, verbose)
+        return _PRINTER
+
+def _init_printer(printer, verbose):
     try:
         printer._raw(b'\x1b\x40')  # ESC @ initialize
+        forget_codepage(printer)
         _log("Printer initialized.", verbose)
     except Exception as e:
         raise PrinterError(f"Failed to initialize printer: {e}")
 
-    _PRINTER = printer
+    if WRITE_BUFFER_SIZE and getattr(printer, "_transport", None) is None:
+        BufferedTransport(printer, WRITE_BUFFER_SIZE)
+    return printer
+
+def _active_printer():
+    session = getattr(_BOUND, "session", None)
+    if session is not None:
+        return session.printer
     return _PRINTER
 
+def set_backend(factory):
+    """
+    Route find_printer() to factory() instead of USB discovery.
+    None restores USB. The cached printer is dropped either way.
+    """
+    global _BACKEND
+    reset_printer(verbose=False)
+    _BACKEND = factory
+
+
+class CapturePrinter(Dummy):
+    """
+    Printer sink that keeps the exact ESC/POS byte stream in memory,
+    for rendering jobs on machines without a printer.
+    """
+
+    def save(self, path):
+        data = self.output
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+
+def use_capture():
+    """
+    Send all following output to one CapturePrinter and return it.
+    """
+    capture = CapturePrinter()
+    set_backend(lambda: capture)
+    return capture
+
+
+# ---------------------------
+# Sessions (several printers)
+# ---------------------------
+
+class PrinterSession:
+    """
+    One printer's connection, opened lazily through factory() and
+    reopened after reset(). Used by printer_pool: each pool worker binds
+    its session with use_session(), so the modes' find_printer(),
+    flush() and reset_printer() act on that printer.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.printer = None
+        self.lock = threading.RLock()
+
+    def connect(self, verbose=True):
+        if self.printer is not None:
+            return self.printer
+        with self.lock:
+            if self.printer is None:
+                self.printer = _init_printer(self.factory(), verbose)
+                _log(f"Printer {self.name} connected.", verbose)
+            return self.printer
+
+    def reset(self, verbose=True):
+        with self.lock:
+            printer, self.printer = self.printer, None
+            if printer is None:
+                return
+            transport = getattr(printer, "_transport", None)
+            if transport is not None:
+                transport.discard()
+            try:
+                printer.close()
+                _log(f"Printer {self.name} connection closed.", verbose)
+            except Exception:
+                pass
+
+
+class _DefaultSession:
+    """
+    The module-level printer (find_printer / _PRINTER) seen as a session.
+    """
+
+    name = "default"
+    lock = _CONNECT_LOCK
+
+    @property
+    def printer(self):
+        return _PRINTER
+
+    def connect(self, verbose=True):
+        return find_printer(verbose=verbose)
+
+
+@contextmanager
+def use_session(session):
+    """
+    with use_session(session): route this thread's printer calls to session.
+    """
+    previous = getattr(_BOUND, "session", None)
+    _BOUND.session = session
+    try:
+        yield session
+    finally:
+        _BOUND.session = previous
+
+
+# ---------------------------
+# USB connection
+# ---------------------------
+
+class UsbIdentity:
+    """
+    Bus / port path, interface and OUT / IN endpoints of a printer that
+    worked. in_ep is None if the interface has none (status reads then
+    use escpos' default).
+    """
+
+    def __init__(self, bus, port_numbers, interface, out_ep, in_ep=None):
+        self.bus = bus
+        self.port_numbers = tuple(port_numbers or ())
+        self.interface = interface
+        self.out_ep = out_ep
+        self.in_ep = in_ep
+
+    def matches(self, device):
+        return device.bus == self.bus and tuple(device.port_numbers or ()) == self.port_numbers
+
+
+class CachedUsb(Usb):
+    """
+    escpos Usb printer that reopens through the cached UsbIdentity: one
+    targeted lookup, the known interface claimed, no set_configuration()
+    if already configured and no device reset. escpos' own open() (find
+    by VID:PID, configure, reset) is the fallback.
+
+    python-escpos reopens lazily on the next write after close(), which
+    is what stream mode does on every flush.
+
+    With identity= the printer is pinned to that bus / port (pool
+    members): there is no fallback, which could open a sibling printer.
+    """
+
+    def __init__(self, *args, identity=None, **kwargs):
+        self.identity = identity
+        super().__init__(*args, **kwargs)
+
+    def open(self, raise_not_found=True):
+        if self._device:
+            self.close()
+
+        if self.identity is not None:
+            start = time.perf_counter()
+            try:
+                self.device = _open_identity(self.identity)
+            except Exception:
+                _RECONNECTS["fast"]["failures"] += 1
+                raise
+            self._use_endpoints(self.identity)
+            _record_reconnect("fast", start)
+            return
+
+        identity = _IDENTITY
+        if identity is not None:
+            start = time.perf_counter()
+            try:
+                self.device = _open_identity(identity)
+                self._use_endpoints(identity)
+                _record_reconnect("fast", start)
+                return
+            except (usb.core.USBError, PrinterError, NotImplementedError) as e:
+                _RECONNECTS["fast"]["failures"] += 1
+                _log(f"Fast reconnect failed ({e}), searching by VID:PID", True, level="warning")
+
+        start = time.perf_counter()
+        try:
+            super().open(raise_not_found)
+        except Exception:
+            _RECONNECTS["full"]["failures"] += 1
+            raise
+        if self.device:
+            _record_reconnect("full", start)
+            _remember(self.device, 0, self.out_ep, self.in_ep)   # escpos always uses interface 0
+
+    def _use_endpoints(self, identity):
+        self.out_ep = identity.out_ep
+        if identity.in_ep is not None:
+            self.in_ep = identity.in_ep
+
+
+def _libusb():
+    global _LIBUSB
+    if _LIBUSB is False:
+        _LIBUSB = usb.backend.libusb1.get_backend()
+    return _LIBUSB
+
+
+def _remember(device, interface, out_ep, in_ep=None):
+    global _IDENTITY
+    _IDENTITY = UsbIdentity(device.bus, device.port_numbers, interface, out_ep, in_ep)
+
+
+def _interface_endpoints(intf):
+    """
+    (OUT, IN) endpoint addresses of an interface, None where it has none.
+    A bulk IN endpoint (status replies) is preferred over an interrupt one.
+    """
+    out_ep = in_ep = None
+    in_bulk = False
+    for endpoint in intf:
+        address = endpoint.bEndpointAddress
+        if usb.util.endpoint_direction(address) == usb.util.ENDPOINT_OUT:
+            if out_ep is None:
+                out_ep = address
+        elif in_ep is None or not in_bulk:
+            in_ep = address
+            in_bulk = usb.util.endpoint_type(endpoint.bmAttributes) == usb.util.ENDPOINT_TYPE_BULK
+    return out_ep, in_ep
+
+
+def _open_identity(identity):
+    device = usb.core.find(
+        idVendor=PRINTER_VENDOR_ID,
+        idProduct=PRINTER_PRODUCT_ID,
+        custom_match=identity.matches,
+        backend=_libusb()
+    )
+    if device is None:
+        raise PrinterError(f"No printer at bus {identity.bus} port {identity.port_numbers}")
+
+    try:
+        if device.is_kernel_driver_active(identity.interface):
+            device.detach_kernel_driver(identity.interface)
+    except NotImplementedError:
+        pass
+
+    try:
+        configured = device.get_active_configuration() is not None
+    except usb.core.USBError:
+        configured = False
+    if not configured:
+        device.set_configuration()
+
+    usb.util.claim_interface(device, identity.interface)
+    return device
+
+
+def _record_reconnect(path, start):
+    stats = _RECONNECTS[path]
+    stats["count"] += 1
+    stats["ms"].append((time.perf_counter() - start) * 1000)
+
+
+def reconnect_stats():
+    """
+    Connection latency per path: "fast" (cached identity) and "full"
+    (enumeration / escpos open), with failure counts.
+    """
+    out = {}
+    for path, stats in _RECONNECTS.items():
+        ms = sorted(stats["ms"])
+        out[path] = {
+            "count": stats["count"],
+            "failures": stats["failures"],
+            "last_ms": round(stats["ms"][-1], 2) if ms else None,
+            "median_ms": round(ms[len(ms) // 2], 2) if ms else None,
+            "max_ms": round(ms[-1], 2) if ms else None,
+        }
+    return out
+
+
+def _connect_usb(verbose=True, stream_mode=False):
+    """
+    Reopen the last good device directly; enumerate everything only if
+    that fails.
+    """
+    global _IDENTITY
+
+    if _IDENTITY is not None:
+        printer = CachedUsb(PRINTER_VENDOR_ID, PRINTER_PRODUCT_ID, out_ep=_IDENTITY.out_ep)
+        try:
+            printer.open()
+            return printer
+        except Exception as e:
+            _log(f"Reconnect failed ({e}), rescanning USB.", verbose, level="warning")
+            _IDENTITY = None
+
+    start = time.perf_counter()
+    try:
+        printer = _discover_printer(verbose=verbose, stream_mode=stream_mode)
+    except PrinterError:
+        _RECONNECTS["full"]["failures"] += 1
+        raise
+    _record_reconnect("full", start)
+    return printer
+
+
 def _discover_printer(verbose=True, stream_mode=False):
-    backend = usb.backend.libusb1.get_backend()
+    backend = _libusb()
     devices = usb.core.find(find_all=True, backend=backend)
 
     if devices is None:
@@ -83,21 +440,21 @@ def _discover_printer(verbose=True, stream_mode=False):
                         try:
                             usb.util.claim_interface(device, intf.bInterfaceNumber)
 
-                            endpoint = usb.util.find_descriptor(
-                                intf,
-                                custom_match=lambda e:
-                                    usb.util.endpoint_direction(e.bEndpointAddress)
-                                    == usb.util.ENDPOINT_OUT
-                            )
+                            out_ep, in_ep = _interface_endpoints(intf)
 
-                            if endpoint:
-                                return Usb(
+                            if out_ep is not None:
+                                _remember(device, intf.bInterfaceNumber, out_ep, in_ep)
+                                printer = CachedUsb(
                                     vendor_id,
                                     product_id,
-                                    intf.bInterfaceNumber,
-                                    0,
-                                    backend=backend
+                                    timeout=0,
+                                    out_ep=out_ep
                                 )
+                                if in_ep is not None:
+                                    printer.in_ep = in_ep
+                                # already configured and claimed here
+                                printer.device = device
+                                return printer
 
                         except usb.core.USBError as e:
                             _log(f"Could not claim interface {intf.bInterfaceNumber}: {e}", verbose)
@@ -110,6 +467,576 @@ def _discover_printer(verbose=True, stream_mode=False):
 
     raise PrinterError("No matching USB printer found.")
 
+def discover_printers(verbose=True):
+    """
+    Every connected VID:PID printer as {name: UsbIdentity}. The name is the
+    USB serial number when the devices have distinct ones, else the bus /
+    port path ("usb:1-1.2"), which is stable as long as the cabling is.
+    """
+    devices = usb.core.find(
+        find_all=True,
+        idVendor=PRINTER_VENDOR_ID,
+        idProduct=PRINTER_PRODUCT_ID,
+        backend=_libusb()
+    )
+
+    found = []
+    for device in devices or ():
+        out_ep = in_ep = None
+        interface = 0
+        try:
+            for cfg in device:
+                for intf in cfg:
+                    out_ep, in_ep = _interface_endpoints(intf)
+                    if out_ep is not None:
+                        interface = intf.bInterfaceNumber
+                        break
+                if out_ep is not None:
+                    break
+        except usb.core.USBError as e:
+            _log(f"Skipping printer on bus {device.bus}: {e}", verbose, level="warning")
+            continue
+        if out_ep is None:
+            continue
+
+        serial = None
+        try:
+            if device.iSerialNumber:
+                serial = usb.util.get_string(device, device.iSerialNumber)
+        except (usb.core.USBError, ValueError, NotImplementedError):
+            pass
+        path = f"usb:{device.bus}-" + ".".join(str(p) for p in device.port_numbers or ())
+        found.append((serial, path, UsbIdentity(device.bus, device.port_numbers, interface, out_ep, in_ep)))
+
+    # cheap clones often share one serial number (or have none)
+    serials = [serial for serial, _, _ in found]
+    printers = {}
+    for serial, path, identity in found:
+        name = serial if serial and serials.count(serial) == 1 else path
+        printers[name] = identity
+        _log(f"Printer found: {name} (bus {identity.bus}, port {identity.port_numbers})", verbose)
+    return printers
+
+
+def usb_session(name, identity):
+    """
+    PrinterSession for one discovered printer, pinned to its USB path.
+    """
+    return PrinterSession(
+        name,
+        lambda: CachedUsb(PRINTER_VENDOR_ID, PRINTER_PRODUCT_ID, out_ep=identity.out_ep, identity=identity)
+    )
+
+
+def _is_timeout(error):
+    timeout_error = getattr(usb.core, "USBTimeoutError", None)
+    if timeout_error is not None and isinstance(error, timeout_error):
+        return True
+    return isinstance(error, usb.core.USBError) and (
+        getattr(error, "errno", None) in (110, 60, 10060) or "timed out" in str(error).lower()
+    )
+
+
+class BufferedTransport:
+    """
+    Write-coalescing wrapper around a printer's _raw().
+
+    Installs itself on the printer instance, so every python-escpos call
+    (text, set, image, cut, ...) and every send_raw() lands in one bytearray
+    instead of its own USB bulk transfer. Pending bytes are sent when the
+    size threshold is reached, on flush(), after cut() and before close().
+
+    Flushes are written in chunk_size pieces. Pacing:
+      "drain"   before each chunk, estimate the printer's buffer fill from
+                the drain rate seen on writes the device throttled, and wait
+                instead of letting a write block until it times out
+      "status"  "drain", plus: before a flush that starts on a command
+                boundary, poll DLE EOT 1 and wait while the printer reports
+                offline (paper feed, cover open). Never inside a command, so
+                raster data is not interleaved. Needs a readable printer,
+                else falls back to "drain".
+      "off"     no pacing
+    On USB, chunks go straight to device.write() so a short write is seen:
+    only the unsent tail is resent. A chunk that times out or comes up
+    short is retried after a back-off, up to retries times.
+    """
+
+    def __init__(self, printer, flush_size=WRITE_BUFFER_SIZE, chunk_size=None,
+                 pacing=None, retries=None, buffer_bytes=None):
+        # None: module settings at creation time, so they can be tuned at runtime
+        self.printer = printer
+        self.flush_size = flush_size
+        self.chunk_size = WRITE_CHUNK_SIZE if chunk_size is None else chunk_size
+        self.pacing = pacing or WRITE_PACING
+        self.retries = WRITE_RETRIES if retries is None else retries
+        self.buffer_bytes = buffer_bytes or PRINTER_BUFFER_BYTES
+        self.buffer = bytearray()
+
+        # held while bytes go to the device; the status monitor only polls
+        # when it is free and the stream sent so far ends on a command
+        self.lock = threading.Lock()
+        self.at_boundary = True
+
+        self.writes = 0         # _raw() calls received
+        self.transfers = 0      # writes actually sent to the device
+        self.bytes_sent = 0
+        self.retried = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.paced_seconds = 0.0
+
+        self.drain_rate = None  # bytes/s, measured
+        self._fill = 0.0        # estimated bytes in the printer's buffer
+        self._paced = False
+        self._fill_time = time.perf_counter()
+
+        # finite timeout so a stuck chunk surfaces and can be retried
+        if WRITE_TIMEOUT_MS and getattr(printer, "timeout", None) == 0:
+            printer.timeout = WRITE_TIMEOUT_MS
+
+        self._raw = printer._raw
+        self._cut = printer.cut
+        self._close = printer.close
+
+        printer._raw = self.write
+        printer.cut = self.cut
+        printer.close = self.close
+        printer._transport = self
+
+    def write(self, data):
+        self.writes += 1
+        self.buffer += data
+        if len(self.buffer) >= self.flush_size:
+            # the threshold can fall inside a command (raster data)
+            self._flush(boundary=False)
+
+    def flush(self):
+        self._flush(boundary=True)
+
+    def _flush(self, boundary):
+        if not self.buffer:
+            return
+        data = bytes(self.buffer)
+        self.buffer.clear()
+
+        with self.lock:
+            if self.pacing == "status" and self.at_boundary:
+                self._wait_ready()
+            self.at_boundary = False
+            before = (self.transfers, self.retried, self.stalls, self.stall_seconds)
+            start = time.perf_counter()
+            try:
+                self._send(data)
+                self.at_boundary = boundary
+            finally:
+                job_metrics.record_transfer(
+                    len(data), time.perf_counter() - start,
+                    chunks=self.transfers - before[0],
+                    retries=self.retried - before[1],
+                    stalls=self.stalls - before[2],
+                    stall_seconds=self.stall_seconds - before[3]
+                )
+            self.bytes_sent += len(data)
+
+    def discard(self):
+        self.buffer.clear()
+
+    # ---------------------------
+    # Flow control
+    # ---------------------------
+
+    def _send(self, data):
+        size = self.chunk_size or len(data)
+        for i in range(0, len(data), size):
+            chunk = data[i:i + size]
+            self._pace(len(chunk))
+            self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk):
+        # pyusb (libusb1) returns the transferred count when a timeout moved
+        # some bytes and raises only when it moved none, so resending from
+        # sent never duplicates: keep the short-write path
+        sent = 0
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                written = self._write_some(chunk[sent:])
+            except Exception as e:
+                if not _is_timeout(e) or attempt == self.retries:
+                    raise
+                self._stall(time.perf_counter() - start)
+                reason = "timed out"
+            else:
+                elapsed = time.perf_counter() - start
+                self.transfers += 1
+                if elapsed > STALL_SECONDS:
+                    self._stall(elapsed)
+                self._observe(written, elapsed)
+                sent += written
+                if sent >= len(chunk):
+                    return
+                if attempt == self.retries:
+                    raise PrinterError(f"USB write incomplete: {sent} of {len(chunk)} bytes accepted")
+                reason = f"accepted {sent} of {len(chunk)} bytes"
+
+            self.retried += 1
+            _log(f"USB write {reason}, retrying the rest ({attempt + 1}/{self.retries})", True, level="warning")
+            # the printer is full: let it drain before resending
+            self._fill = self.buffer_bytes
+            time.sleep(0.2 * (attempt + 1))
+
+    def _write_some(self, data):
+        """
+        Write data, return the number of bytes the device accepted (short
+        after a timeout that moved some of them). escpos' Usb._raw drops
+        that count, so USB printers are written directly.
+        """
+        if isinstance(self.printer, Usb):
+            return self.printer.device.write(self.printer.out_ep, data, self.printer.timeout)
+        self._raw(data)
+        return len(data)
+
+    def _stall(self, seconds):
+        self.stalls += 1
+        self.stall_seconds += seconds
+
+    def _observe(self, nbytes, elapsed):
+        now = time.perf_counter()
+        self._drain(now)
+        # A write far slower than USB full speed was throttled by the
+        # printer: its buffer is full and it accepts bytes at drain rate
+        if elapsed > 0.005 and nbytes / elapsed < 200_000:
+            rate = nbytes / elapsed
+            self.drain_rate = rate if self.drain_rate is None else 0.7 * self.drain_rate + 0.3 * rate
+            self._fill = self.buffer_bytes
+        else:
+            if self.drain_rate and self._paced:
+                # not throttled although we waited: the estimate is low, probe up
+                self.drain_rate *= 1.1
+            self._fill = min(self.buffer_bytes, self._fill + nbytes)
+        self._paced = False
+
+    def _drain(self, now):
+        if self.drain_rate:
+            self._fill = max(0.0, self._fill - self.drain_rate * (now - self._fill_time))
+        self._fill_time = now
+
+    def _pace(self, nbytes):
+        # "status" polls per flush (see _flush); between chunks it paces by drain rate
+        if self.pacing in ("drain", "status") and self.drain_rate:
+            self._drain(time.perf_counter())
+            excess = self._fill + nbytes - self.buffer_bytes
+            if excess > 0:
+                wait = excess / self.drain_rate
+                self.paced_seconds += wait
+                self._paced = True
+                time.sleep(wait)
+                self._drain(time.perf_counter())
+
+    def _wait_ready(self):
+        """
+        DLE EOT 1: bit 3 set = offline. Returns when online. Only call with
+        the stream sent so far ending on a command boundary.
+        """
+        deadline = time.perf_counter() + STATUS_WAIT_SECONDS
+        while True:
+            try:
+                status = read_status_byte(self.printer, 1, raw=self._raw)
+            except Exception as e:
+                _log(f"No real-time status ({e}), pacing by drain rate instead", True, level="warning")
+                self.pacing = "drain"
+                return
+            if status is None or not status & 0x08:
+                return
+            if time.perf_counter() > deadline:
+                raise PrinterError("Printer offline (DLE EOT status), giving up")
+            time.sleep(0.05)
+
+    def cut(self, *args, **kwargs):
+        self._cut(*args, **kwargs)
+        self.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._close()
+
+    def stats(self):
+        return {
+            "writes": self.writes,
+            "transfers": self.transfers,
+            "bytes_sent": self.bytes_sent,
+            "pending": len(self.buffer),
+            "retries": self.retried,
+            "stalls": self.stalls,
+            "stall_seconds": round(self.stall_seconds, 4),
+            "paced_seconds": round(self.paced_seconds, 4),
+            "drain_rate": round(self.drain_rate) if self.drain_rate else None,
+        }
+
+
+def flush(printer=None):
+    """
+    Push any buffered output to the device. Safe on unbuffered printers.
+    """
+    if printer is None:
+        printer = _active_printer()
+    transport = getattr(printer, "_transport", None)
+    if transport is not None:
+        transport.flush()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
+
+
+# ---------------------------
+# Real-time status
+# ---------------------------
+
+def read_status_byte(printer, n, raw=None):
+    """
+    Send DLE EOT n and return the status byte, or None if the answer is
+    missing or malformed. raw writes past the BufferedTransport (default:
+    its underlying _raw). Raises if the printer cannot be read at all.
+    """
+    if raw is None:
+        transport = getattr(printer, "_transport", None)
+        raw = transport._raw if transport is not None else printer._raw
+
+    raw(b"\x10\x04" + bytes([n]))
+    if isinstance(printer, Usb):
+        # short timeout: the writer may be waiting for the transport lock
+        answer = printer.device.read(printer.in_ep, 16, STATUS_READ_TIMEOUT_MS)
+    else:
+        answer = printer._read()
+
+    if not answer:
+        return None
+    status = answer[-1]     # older bytes may be stale answers
+    # every DLE EOT reply has bits 1 and 4 set, bits 0 and 7 clear
+    if status & 0x93 != 0x12:
+        return None
+    return status
+
+
+def _decode_status(printer_byte, offline_byte, paper_byte):
+    state = {
+        "online": None,
+        "cover_open": None,
+        "paper_out": None,
+        "paper_near_end": None,
+        "error": None,
+    }
+    if printer_byte is not None:
+        state["online"] = not printer_byte & 0x08
+    if offline_byte is not None:
+        state["cover_open"] = bool(offline_byte & 0x04)
+        state["error"] = bool(offline_byte & 0x40)
+        state["paper_out"] = bool(offline_byte & 0x20)
+    if paper_byte is not None:
+        state["paper_near_end"] = bool(paper_byte & 0x0C)
+        state["paper_out"] = bool(paper_byte & 0x60) or bool(state["paper_out"])
+
+    if state["paper_out"]:
+        state["state"] = "paper_out"
+    elif state["cover_open"]:
+        state["state"] = "cover_open"
+    elif state["error"]:
+        state["state"] = "error"
+    elif state["online"] is False:
+        state["state"] = "offline"
+    elif state["online"]:
+        state["state"] = "ready"
+    else:
+        state["state"] = "unknown"
+    return state
+
+
+class StatusMonitor:
+    """
+    Background thread polling DLE EOT 1/2/4 every interval seconds.
+
+    It only talks to the printer while the transport is idle and the bytes
+    sent so far end on a command (a DLE EOT inside raster data would be
+    printed as dots), so polls pause during a job and never hold up the
+    writer for more than one status read. It never opens the printer
+    itself: with no printer it reports "disconnected", and while the
+    printer is closed between jobs it skips the poll. status() returns the
+    cached result without any I/O. session: the PrinterSession to watch,
+    default the module-level printer.
+    """
+
+    STALLED = ("paper_out", "cover_open", "offline", "error")
+
+    def __init__(self, interval=STATUS_INTERVAL, session=None):
+        self.interval = interval
+        self.session = session or _DefaultSession()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._state = {"state": "unknown", "checked": None, "polls": 0, "skipped_busy": 0, "skipped_closed": 0, "detail": None}
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"printer-status-{self.session.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        with self._lock:
+            state = dict(self._state)
+        if state["checked"] is not None:
+            state["age_s"] = round(time.time() - state["checked"], 3)
+        return state
+
+    def stalled(self):
+        """
+        True only if the last fresh poll saw the printer unable to print.
+        Unknown or stale states do not count: no status, no pause.
+        """
+        with self._lock:
+            return self._stalled_locked()
+
+    def _stalled_locked(self):
+        checked = self._state["checked"]
+        fresh = checked is not None and time.time() - checked < 3 * self.interval + 1
+        return fresh and self._state["state"] in self.STALLED
+
+    def wait_ready(self, timeout=None):
+        """
+        Block until the printer is not stalled; returns False on timeout.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: not self._stalled_locked(), timeout)
+
+    def poll(self):
+        """
+        One status read now (also used by the thread). Returns False if the
+        printer was busy or closed and nothing was read.
+        """
+        session = self.session
+        if not session.lock.acquire(blocking=False):
+            return self._skipped()
+        try:
+            # connecting (a USB scan) or reopening is left to the jobs
+            printer = session.printer
+            if printer is None:
+                self._update({"state": "disconnected", "detail": "no printer connected"})
+                return True
+            if not _device_open(printer):
+                return self._skipped("skipped_closed")
+
+            transport = getattr(printer, "_transport", None)
+            if transport is None:
+                # unbuffered writes give no way to find a command boundary
+                self._update({"state": "unknown", "detail": "no buffered transport"})
+                return True
+
+            # the transport lock is held for one read at a time, so a job
+            # that starts meanwhile waits for at most one read timeout
+            raw_status = []
+            for n in (1, 2, 4):
+                if not transport.lock.acquire(blocking=False):
+                    return self._skipped()
+                try:
+                    if not transport.at_boundary:
+                        return self._skipped()
+                    if not _device_open(printer):
+                        return self._skipped("skipped_closed")
+                    raw_status.append(read_status_byte(printer, n, raw=transport._raw))
+                except Exception as e:
+                    if _is_timeout(e):
+                        self._update({"state": "unknown", "detail": "no status reply"})
+                    else:
+                        self._update({"state": "unknown", "detail": f"status not readable: {e}"})
+                    return True
+                finally:
+                    transport.lock.release()
+        finally:
+            session.lock.release()
+
+        state = _decode_status(*raw_status)
+        state["detail"] = None
+        self._update(state)
+        return True
+
+    def _skipped(self, reason="skipped_busy"):
+        with self._lock:
+            self._state[reason] += 1
+        return False
+
+    def _update(self, fields):
+        with self._changed:
+            previous = self._state["state"]
+            self._state.update(fields)
+            self._state["checked"] = time.time()
+            self._state["polls"] += 1
+            self._changed.notify_all()
+        if fields["state"] != previous:
+            level = "warning" if fields["state"] in self.STALLED + ("disconnected",) else "info"
+            _log(f"printer {self.session.name} status: {previous} -> {fields['state']}", True, level=level)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                _log(f"status poll failed: {e}", True, level="warning")
+            self._stop.wait(self.interval)
+
+
+def _device_open(printer):
+    """
+    False if an escpos Usb printer is closed: touching its device would
+    reopen and claim it. Other backends have no lazy reopen.
+    """
+    return not isinstance(printer, Usb) or bool(printer._device)
+
+
+def start_status_monitor(interval=STATUS_INTERVAL):
+    """
+    Start (once) and return the background status monitor.
+    """
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = StatusMonitor(interval)
+    return _MONITOR.start()
+
+
+def printer_status():
+    """
+    Latest cached status; {"state": "unmonitored"} without a monitor.
+    """
+    if _MONITOR is None:
+        return {"state": "unmonitored"}
+    return _MONITOR.status()
+
+
+def wait_until_ready(timeout=None):
+    """
+    Block while the monitor reports the printer stalled (paper out, cover
+    open, offline). Returns at once when no monitor runs.
+    """
+    if _MONITOR is None:
+        return True
+    return _MONITOR.wait_ready(timeout)
+
+
 def reset_formatting(printer=None):
     if printer is None:
         printer = find_printer()
@@ -120,6 +1047,7 @@ def init_printer_state(printer):
     Full ESC/POS reset + canonical defaults
     """
     printer._raw(b'\x1b\x40')  # ESC @
+    forget_codepage(printer)
 
     # normalize state explicitly
     printer.set(
@@ -132,6 +1060,54 @@ def init_printer_state(printer):
     send_raw(printer, b'\x1b\x2d\x00')
 
 
+def select_codepage(printer, n):
+    """
+    Send ESC t n unless codepage n is already active on this printer.
+
+    python-escpos' text() switches codepages on its own, so the magic
+    encoder's state is cleared on every switch we make: if it is set again
+    later, the printer has moved to another table and ours is stale.
+    Returns True if the command was sent.
+    """
+    stats = codepage_stats(printer)
+    magic = getattr(printer, "magic", None)
+    magic_switched = magic is not None and magic.encoding is not None and not magic.disabled
+
+    if getattr(printer, "_codepage", None) == n and not magic_switched:
+        stats["skipped"] += 1
+        stats["bytes_saved"] += 3
+        return False
+
+    printer._raw(b"\x1B\x74" + bytes([n]))
+    printer._codepage = n
+    if magic is not None and not magic.disabled:
+        magic.encoding = None
+    stats["switches"] += 1
+    return True
+
+
+def forget_codepage(printer):
+    """
+    Mark the active codepage as unknown, e.g. after ESC @.
+    """
+    printer._codepage = None
+
+
+def codepage_stats(printer=None, reset=False):
+    """
+    Counters of ESC t commands sent and dropped on this printer.
+    With reset=True the counters are returned and started over (per job).
+    """
+    if printer is None:
+        printer = _active_printer()
+        if printer is None:
+            return None
+    stats = getattr(printer, "_codepage_stats", None)
+    if stats is None or reset:
+        printer._codepage_stats = {"switches": 0, "skipped": 0, "bytes_saved": 0}
+    return stats if stats is not None else printer._codepage_stats
+
+
 def send_raw(printer, data: bytes): #BROKEN!
     """
     Send raw ESC/POS bytes to the printer.
@@ -153,14 +1129,23 @@ def send_raw(printer, data: bytes): #BROKEN!
 def reset_printer(verbose=True):
     global _PRINTER
 
-    if _PRINTER:
-        try:
-            _PRINTER.close()
-            _log("Printer connection closed.", verbose)
-        except Exception:
-            pass
+    session = getattr(_BOUND, "session", None)
+    if session is not None:
+        session.reset(verbose=verbose)
+        return
+
+    with _CONNECT_LOCK:
+        if _PRINTER:
+            transport = getattr(_PRINTER, "_transport", None)
+            if transport is not None:
+                transport.discard()
+            try:
+                _PRINTER.close()
+                _log("Printer connection closed.", verbose)
+            except Exception:
+                pass
 
-    _PRINTER = None
+        _PRINTER = None
     
 def cut_paper(verbose=True):
     try:
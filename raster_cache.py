@@ -0,0 +1,224 @@
+# raster_cache.py — content-addressed cache of finished 1-bit rasters
+#
+# Two tiers: an in-memory LRU bounded by bytes, and a directory of files
+# bounded by total size (oldest-used evicted first). Keys are a hash of the
+# source image bytes plus every setting that changes the raster.
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+from PIL import Image, ImageChops
+
+RASTER_CACHE_DIR = os.getenv(
+    "THERMAL_RASTER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "print-esc-pos", "rasters")
+)
+RASTER_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+RASTER_CACHE_DISK_BYTES = 256 * 1024 * 1024
+RASTER_CACHE_DISK_LOW_WATER = 0.9      # eviction trims the directory to this share of the limit
+
+
+class CachedRaster(namedtuple("CachedRaster", "width height raster")):
+    """
+    width/height in pixels, raster is the complete GS v 0 command.
+    """
+
+    def to_image(self):
+        # GS v 0 is 1 = black, PIL mode "1" is 1 = white
+        img = Image.frombytes("1", (self.width, self.height), bytes(self.raster[8:]))
+        return ImageChops.invert(img)
+
+
+def make_key(source, **params):
+    """
+    sha256 over the source (bytes, or a PIL image's pixels and palette)
+    and params.
+    """
+    h = hashlib.sha256()
+    if isinstance(source, Image.Image):
+        h.update(f"{source.mode}:{source.size}".encode())
+        h.update(source.tobytes())
+        if source.palette is not None:
+            # "P" pixels are palette indices: same bytes, other colors
+            h.update(bytes(source.getpalette() or ()))
+    else:
+        h.update(bytes(source))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class RasterCache:
+    def __init__(self, directory=RASTER_CACHE_DIR,
+                 memory_bytes=RASTER_CACHE_MEMORY_BYTES,
+                 disk_bytes=RASTER_CACHE_DISK_BYTES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+        # running size of the disk tier, scanned once and resynced on eviction
+        self._disk_used = None
+        self._disk_lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._disk_get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._memory_put(key, entry)
+        return entry
+
+    def put(self, key, width, height, raster):
+        entry = CachedRaster(width, height, bytes(raster))
+        self._memory_put(key, entry)
+        self._disk_put(key, entry)
+        return entry
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+        }
+
+    # ---------------------------
+    # Memory tier
+    # ---------------------------
+
+    def _memory_put(self, key, entry):
+        size = len(entry.raster)
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_used -= len(old.raster)
+            self._memory[key] = entry
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted.raster)
+
+    # ---------------------------
+    # Disk tier
+    # ---------------------------
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def _disk_get(self, key):
+        if not self.directory or not self.disk_bytes:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            return None
+        if len(data) < 12:
+            return None
+        width = int.from_bytes(data[:4], "little")
+        height = data[10] | (data[11] << 8)
+        return CachedRaster(width, height, data[4:])
+
+    def _disk_put(self, key, entry):
+        if not self.directory or not self.disk_bytes:
+            return
+        path = self._path(key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # unique per writer: other threads and processes may store the same key
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry.width.to_bytes(4, "little"))
+                f.write(entry.raster)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return
+
+        with self._disk_lock:
+            if self._disk_used is None:
+                self._disk_used = self._disk_scan()[1]
+            else:
+                self._disk_used += 4 + len(entry.raster) - replaced
+            if self._disk_used > self.disk_bytes:
+                self._disk_evict()
+
+    def _disk_scan(self):
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".bin"):
+                    continue
+                p = os.path.join(root, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        return files, total
+
+    def _disk_evict(self):
+        # only when the running total crosses the limit; the scan also picks
+        # up files other processes added or removed
+        files, total = self._disk_scan()
+        target = self.disk_bytes * RASTER_CACHE_DISK_LOW_WATER
+
+        for _, size, p in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+            except OSError:
+                continue
+            total -= size
+        self._disk_used = total
+
+
+_CACHE = None
+
+
+def get_cache():
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = RasterCache()
+    return _CACHE
@@ -1,11 +1,16 @@
 import os
 import sys
+import queue
+import codecs
 import base64
+import asyncio
 import tempfile
 from typing import Optional, Literal
 
-from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi import FastAPI, HTTPException, Header, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 
@@ -17,6 +22,9 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
 import print as print_module
+import print_queue
+import printer_utils
+import job_metrics
 
 
 # -------------------------------------------------
@@ -28,6 +36,53 @@ API_TOKEN = os.getenv("THERMAL_API_TOKEN")
 if not API_TOKEN:
     raise RuntimeError("THERMAL_API_TOKEN environment variable not set.")
 
+# Jobs waiting for the printer before /api/print answers 429
+QUEUE_DEPTH = int(os.getenv("THERMAL_QUEUE_DEPTH", print_queue.QUEUE_MAX_DEPTH))
+
+# /api/print/upload: bodies are spooled to disk in chunks, up to this size
+UPLOAD_MAX_BYTES = int(os.getenv("THERMAL_UPLOAD_MAX_BYTES", 32 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# /api/print/stream: lines accepted ahead of the printer before the client is slowed down
+STREAM_MAX_PENDING_LINES = int(os.getenv("THERMAL_STREAM_MAX_PENDING", 200))
+STREAM_END = "\x04"        # EOT at the end of a WebSocket message ends the stream
+
+# THERMAL_SIMULATE=1 (virtual clock) or =realtime: no USB device needed
+SIMULATE = os.getenv("THERMAL_SIMULATE", "").lower()
+if SIMULATE in ("0", "false", "no"):
+    SIMULATE = ""
+
+# THERMAL_PRINTERS=all: pool of every connected printer (simulated: =N printers)
+PRINTERS = os.getenv("THERMAL_PRINTERS", "1").lower()
+POOL = None
+
+if PRINTERS not in ("", "1"):
+    import printer_pool
+    if SIMULATE:
+        import printer_sim
+        sessions = printer_sim.simulator_sessions(
+            int(PRINTERS) if PRINTERS.isdigit() else 3,
+            realtime=(SIMULATE == "realtime"), keep_output=False
+        )
+        POOL = printer_pool.PrinterPool(sessions, max_depth=QUEUE_DEPTH)
+    else:
+        POOL = printer_pool.PrinterPool.discover(max_depth=QUEUE_DEPTH)
+    POOL.start_monitors()
+    # jobs are looked up across all printers' queues
+    JOBS = POOL
+
+else:
+    if SIMULATE:
+        import printer_sim
+        printer_sim.use_simulator(realtime=(SIMULATE == "realtime"), keep_output=False)
+
+    # One worker owns the USB device; requests only enqueue
+    JOBS = print_queue.PrintQueue(max_depth=QUEUE_DEPTH)
+
+    # Paper / cover / online state, polled in the background (THERMAL_STATUS_INTERVAL=0 disables)
+    if printer_utils.STATUS_INTERVAL > 0:
+        printer_utils.start_status_monitor()
+
 
 # -------------------------------------------------
 # FastAPI App
@@ -61,6 +116,7 @@ def verify_token(x_api_key: str = Header(...)):
 class PrintOptions(BaseModel):
     mode: Literal["text", "image", "raw"]
     cut: bool = False
+    printer: Optional[str] = None     # pool member name; default: least loaded
 
 
 class PrintRequest(BaseModel):
@@ -74,7 +130,28 @@ class PrintRequest(BaseModel):
 # API Endpoint
 # -------------------------------------------------
 
-@app.post("/api/print", dependencies=[Depends(verify_token)])
+def submit_job(run, options, data=None, path=None, cleanup=None, stream=False):
+    """
+    Queue run() on the printer (or the pool member options.printer / the
+    least loaded one). Raises QueueFull, or KeyError for an unknown printer.
+    stream: live text of unknown length, see PrinterPool.submit.
+    """
+    if POOL is None:
+        if options.printer:
+            raise KeyError(f"No printer pool configured (THERMAL_PRINTERS), cannot target {options.printer!r}")
+        return JOBS.submit(run, mode=options.mode, cleanup=cleanup)
+
+    return POOL.submit(
+        run,
+        mode=options.mode,
+        cleanup=cleanup,
+        paper_mm=None if stream else printer_pool.estimate_paper_mm(options.mode, data=data, path=path),
+        target=options.printer,
+        stream=stream
+    )
+
+
+@app.post("/api/print", status_code=202, dependencies=[Depends(verify_token)])
 def print_endpoint(request: PrintRequest):
 
     if not request.text and not (request.file_base64 and request.filename):
@@ -83,48 +160,375 @@ def print_endpoint(request: PrintRequest):
             detail="Provide either 'text' or ('file_base64' and 'filename')."
         )
 
-    temp_file_path = None
-
     try:
         # -----------------------------
-        # Handle text
+        # Decode straight into memory
         # -----------------------------
         if request.text:
-            temp = tempfile.NamedTemporaryFile(delete=False, suffix=".txt")
-            temp.write(request.text.encode("utf-8"))
-            temp.close()
-            temp_file_path = temp.name
+            data = request.text
+        else:
+            data = base64.b64decode(request.file_base64)
 
         # -----------------------------
-        # Handle base64 file
+        # Queue for the Core Print Engine
         # -----------------------------
-        elif request.file_base64 and request.filename:
-            decoded = base64.b64decode(request.file_base64)
-            suffix = os.path.splitext(request.filename)[1] or ".bin"
-            temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp.write(decoded)
-            temp.close()
-            temp_file_path = temp.name
+        def run(data=data, options=request.options):
+            return print_module.core_print(
+                mode=options.mode,
+                cut=options.cut,
+                data=data
+            )
 
-        # -----------------------------
-        # Call Core Print Engine
-        # -----------------------------
-        print_module.core_print(
-            file=temp_file_path,
-            mode=request.options.mode,
-            cut=request.options.cut,
-            extra_args=[]
-        )
+        job = submit_job(run, request.options, data)
+
+    except print_queue.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
-        return {"status": "success"}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {"status": "queued", "job_id": job.id}
+
+
+@app.post("/api/print/upload", status_code=202, dependencies=[Depends(verify_token)])
+async def upload_endpoint(
+    request: Request,
+    mode: Literal["text", "image", "raw"],
+    cut: bool = False,
+    printer: Optional[str] = None,
+    filename: Optional[str] = None
+):
+    """
+    The file as the request body (raw, or the first file of a
+    multipart/form-data body), options in the query string. The body is
+    spooled to disk chunk by chunk, so memory use does not grow with the
+    upload; the print job reads the spool file.
+    """
+    options = PrintOptions(mode=mode, cut=cut, printer=printer)
+
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload larger than {UPLOAD_MAX_BYTES} bytes")
+
+    suffix = os.path.splitext(filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="thermal_upload_", suffix=suffix)
+    queued = False
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            if request.headers.get("content-type", "").startswith("multipart/form-data"):
+                size = await _spool_multipart(request, spool)
+            else:
+                size = await _spool_body(_limited(request.stream()), spool)
+
+        if not size:
+            raise HTTPException(status_code=400, detail="Empty upload.")
+
+        def run(path=path, options=options):
+            return print_module.core_print(file=path, mode=options.mode, cut=options.cut)
+
+        def remove(path=path):
+            os.remove(path)
+
+        # off the event loop: the pool's paper estimate reads the whole spool file
+        job = await run_in_threadpool(submit_job, run, options, path=path, cleanup=remove)
+        queued = True
+
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Upload larger than {UPLOAD_MAX_BYTES} bytes")
+
+    except print_queue.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
     finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
+        if not queued:
+            os.remove(path)
+
+    return {"status": "queued", "job_id": job.id, "bytes": size}
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def _limited(stream):
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > UPLOAD_MAX_BYTES:
+            raise UploadTooLarge()
+        yield chunk
+
+
+async def _spool_body(chunks, spool):
+    size = 0
+    async for chunk in chunks:
+        spool.write(chunk)
+        size += len(chunk)
+    return size
+
+
+async def _spool_multipart(request, spool):
+    # Starlette keeps file parts in a SpooledTemporaryFile (1 MB in memory,
+    # then disk); the size limit is enforced on the raw stream
+    from starlette.formparsers import MultiPartParser, MultiPartException
+
+    try:
+        form = await MultiPartParser(request.headers, _limited(request.stream()), max_files=1, max_fields=10).parse()
+    except MultiPartException as e:
+        # malformed body, no boundary, or more than one file part
+        raise HTTPException(status_code=400, detail=f"Bad multipart body: {e.message}")
+    try:
+        upload = next((v for v in form.values() if hasattr(v, "read")), None)
+        if upload is None:
+            raise HTTPException(status_code=400, detail="Multipart body has no file part.")
+
+        size = 0
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return size
+            spool.write(chunk)
+            size += len(chunk)
+    finally:
+        await form.close()
+
+
+# -------------------------------------------------
+# Live text streams
+# -------------------------------------------------
+
+class StreamAborted(Exception):
+    pass
+
+
+class TextStream:
+    """
+    Lines from a streaming client, handed to one print job running
+    print_text_buffered (FLUSH_LINES / FLUSH_INTERVAL batching, one printer
+    session for the whole stream). At most max_pending lines wait; offer()
+    refuses beyond that and the endpoint slows the client down.
+    """
+
+    def __init__(self, max_pending=STREAM_MAX_PENDING_LINES):
+        self.max_pending = max_pending
+        self.received = 0
+        self.printed = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._partial = ""
+
+    def split(self, text):
+        """
+        Complete lines of text; an unterminated tail waits for the next chunk.
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        self.received += len(lines)
+        return lines
+
+    def offer(self, line):
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            return False
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def end(self, job):
+        """
+        Queue the unterminated tail and the end marker (blocking; run in a thread).
+        """
+        items = [self._partial, None] if self._partial else [None]
+        self._partial = ""
+        for item in items:
+            while job.finished is None:
+                try:
+                    self._queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def lines(self):
+        """
+        Runs in the print worker. Yields "" while idle so the interval
+        flush still fires.
+        """
+        interval = print_module._load("print_text").FLUSH_INTERVAL
+        while True:
             try:
-                os.remove(temp_file_path)
-            except Exception:
-                pass
\ No newline at end of file
+                line = self._queue.get(timeout=interval)
+            except queue.Empty:
+                yield ""
+                continue
+            if line is None:
+                return
+            self.printed += 1
+            yield line
+
+
+def submit_stream(stream, cut, printer):
+    options = PrintOptions(mode="text", cut=cut, printer=printer)
+
+    def run(stream=stream, options=options):
+        return print_module.core_print(
+            mode="text",
+            data=stream.lines(),
+            options={"stream": True, "keep_open": True, "cut": options.cut}
+        )
+
+    return submit_job(run, options, stream=True)
+
+
+async def _offer(stream, line, job, state, send=None):
+    """
+    Hand one line to the job, waiting while the printer is behind. After a
+    slow-down the client is let go again only once the backlog is halved.
+    """
+    while True:
+        if not (state["slowed"] and stream.pending() > stream.max_pending // 2) and stream.offer(line):
+            if state["slowed"]:
+                state["slowed"] = False
+                if send:
+                    await send({"status": "resume", "pending_lines": stream.pending()})
+            return
+
+        if not state["slowed"]:
+            state["slowed"] = True
+            if send:
+                await send({"status": "slow_down", "pending_lines": stream.pending()})
+        if job.finished is not None:
+            raise StreamAborted(job.error or "print job ended")
+        await asyncio.sleep(0.05)
+
+
+@app.websocket("/api/print/stream")
+async def stream_websocket(websocket: WebSocket, cut: bool = False, printer: Optional[str] = None):
+    """
+    Live text (e.g. tail -f) over a WebSocket: send text frames, end with
+    EOT ("\x04") or just close. The server answers with JSON:
+    {"status": "streaming"}, then "slow_down" / "resume" when the printer
+    falls behind, and the final job status after EOT.
+    Token: x-api-key header or ?token= (browsers cannot set headers).
+    """
+    if (websocket.headers.get("x-api-key") or websocket.query_params.get("token")) != API_TOKEN:
+        await websocket.close(code=1008, reason="Invalid API token")
+        return
+    await websocket.accept()
+
+    stream = TextStream()
+    try:
+        job = submit_stream(stream, cut, printer)
+    except print_queue.QueueFull as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    except KeyError as e:
+        await websocket.close(code=1008, reason=str(e.args[0])[:120])
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    state = {"slowed": False}
+
+    # whatever ends the loop (EOT, disconnect, a failed send, an error), the
+    # end marker is queued, or the print worker would wait on this stream forever
+    try:
+        await websocket.send_json({"status": "streaming", "job_id": job.id})
+        done = False
+        while not done:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return      # the client is gone; what it sent still gets printed
+            text = message.get("text")
+            if text is None:
+                # binary frames are taken as UTF-8 (may split characters)
+                text = decoder.decode(message.get("bytes") or b"")
+            done = text.endswith(STREAM_END)
+            for line in stream.split(text[:-1] if done else text):
+                await _offer(stream, line, job, state, websocket.send_json)
+    except StreamAborted as e:
+        try:
+            await websocket.send_json({"status": "failed", "job_id": job.id, "error": str(e)})
+            await websocket.close()
+        except Exception:
+            pass
+        return
+    except WebSocketDisconnect:
+        return
+    finally:
+        await run_in_threadpool(stream.end, job)
+
+    await run_in_threadpool(job.wait)
+    await websocket.send_json({
+        "status": job.status, "job_id": job.id, "lines": stream.printed,
+        "error": job.error, "metrics": job.result
+    })
+    await websocket.close()
+
+
+@app.post("/api/print/stream", dependencies=[Depends(verify_token)])
+async def stream_post(request: Request, cut: bool = False, printer: Optional[str] = None):
+    """
+    The same as a chunked POST (curl -T - ... < <(tail -f log)): lines are
+    printed as they arrive, and reading the body pauses while the printer
+    is behind, so TCP pushes back on the client. Answers when the body ends.
+    """
+    stream = TextStream()
+    try:
+        job = submit_stream(stream, cut, printer)
+    except print_queue.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    state = {"slowed": False}
+    try:
+        async for chunk in request.stream():
+            for line in stream.split(decoder.decode(chunk)):
+                await _offer(stream, line, job, state)
+        for line in stream.split(decoder.decode(b"", final=True)):
+            await _offer(stream, line, job, state)
+    except StreamAborted as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await run_in_threadpool(stream.end, job)
+
+    await run_in_threadpool(job.wait)
+    return {"status": job.status, "job_id": job.id, "lines": stream.printed, "error": job.error, "metrics": job.result}
+
+
+@app.get("/api/jobs/{job_id}", dependencies=[Depends(verify_token)])
+def job_status_endpoint(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    status = job.to_dict()
+    status["metrics"] = job.result
+    return status
+
+
+@app.get("/api/printer/status", dependencies=[Depends(verify_token)])
+def printer_status_endpoint():
+    """
+    Cached DLE EOT state (no printer I/O) and whether the queue is held.
+    """
+    if POOL is not None:
+        return {"printers": POOL.status()}
+    status = printer_utils.printer_status()
+    status["queue"] = {"depth": JOBS.depth(), "paused": JOBS.paused}
+    return status
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Prometheus text format: per-mode job counts, stage duration and
+    byte histograms.
+    """
+    return job_metrics.prometheus_text()
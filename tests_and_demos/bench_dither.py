@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# bench_dither.py — Mpx/s of every dithering algorithm (no printer needed)
+
+import os
+import sys
+import time
+import random
+import argparse
+
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import dither
+
+
+def make_test_image(width, height, seed=0):
+    """
+    Gradients + shapes: closer to real prints than pure noise.
+    """
+    rnd = random.Random(seed)
+    img = Image.linear_gradient("L").resize((width, height))
+    draw = ImageDraw.Draw(img)
+    for _ in range(height // 20):
+        x = rnd.randrange(width)
+        y = rnd.randrange(height)
+        r = rnd.randint(5, 80)
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=rnd.randrange(256))
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dither.to_1bit per algorithm")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--algorithm", action="append", choices=dither.ALGORITHMS,
+                        help="Only these algorithms (repeatable)")
+    args = parser.parse_args()
+
+    img = make_test_image(args.width, args.height)
+    mpx = args.width * args.height / 1e6
+
+    print(f"{args.width}x{args.height} ({mpx:.2f} Mpx)")
+    for algorithm in args.algorithm or dither.ALGORITHMS:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            dither.to_1bit(img, algorithm)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {algorithm:16s} {mpx / best:10.2f} Mpx/s  {best * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# bench_raster.py — rows/second of the GS v 0 raster packer (no printer needed)
+
+import os
+import sys
+import time
+import random
+import argparse
+
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from print_image import pil_to_escpos_raster
+
+
+def pil_to_escpos_raster_loop(img):
+    """
+    Original per-pixel packer, kept here as the reference for output and speed.
+    """
+    width, height = img.size
+    width_bytes = (width + 7) // 8
+
+    pixels = img.load()
+    data = bytearray()
+
+    for y in range(height):
+        for xb in range(width_bytes):
+            byte = 0
+            for bit in range(8):
+                x = xb * 8 + bit
+                if x < width and pixels[x, y] == 0:  # black pixel
+                    byte |= (1 << (7 - bit))
+            data.append(byte)
+
+    header = bytearray([
+        0x1D, 0x76, 0x30, 0x00,
+        width_bytes & 0xFF,
+        (width_bytes >> 8) & 0xFF,
+        height & 0xFF,
+        (height >> 8) & 0xFF
+    ])
+
+    return header + data
+
+
+def make_test_image(width, height, seed=0):
+    rnd = random.Random(seed)
+    img = Image.frombytes("L", (width, height), bytes(rnd.getrandbits(8) for _ in range(width * height)))
+    return img.convert("1")
+
+
+def make_stored_value_image(width, height):
+    """
+    Mode "1" with white stored as 1 instead of 255 (Image.new("1", size, 1)):
+    still white, since only 0 is black.
+    """
+    img = Image.new("1", (width, height), 1)
+    img.paste(0, (0, 0, width // 2, height // 2))
+    return img
+
+
+def bench(fn, img, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(img)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pil_to_escpos_raster")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Odd widths exercise the row padding path as well
+    for width in (args.width, args.width - 3, 13):
+        img = make_stored_value_image(width, 16)
+        if bytes(pil_to_escpos_raster_loop(img)) != bytes(pil_to_escpos_raster(img)):
+            print(f"MISMATCH for stored value 1 at width={width}")
+            sys.exit(1)
+
+    for width in (args.width, args.width - 3):
+        img = make_test_image(width, args.height)
+
+        before = pil_to_escpos_raster_loop(img)
+        after = pil_to_escpos_raster(img)
+        if bytes(before) != bytes(after):
+            print(f"MISMATCH at width={width}")
+            sys.exit(1)
+
+        t_before = bench(pil_to_escpos_raster_loop, img, 1)
+        t_after = bench(pil_to_escpos_raster, img, args.repeat)
+
+        print(f"{width}x{args.height}:")
+        print(f"  loop    : {args.height / t_before:12.0f} rows/s")
+        print(f"  packed  : {args.height / t_after:12.0f} rows/s")
+        print(f"  speedup : {t_before / t_after:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# bench_suite.py — micro-benchmarks of the rendering hot paths (no printer needed)
+#
+# Every case renders a fixed, seeded corpus into an in-memory printer
+# (printer_utils.use_capture) and the timings are written as JSON:
+#
+#   python tests_and_demos/bench_suite.py -o before.json
+#   python tests_and_demos/bench_suite.py -o after.json --compare before.json
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import platform
+import argparse
+import statistics
+import subprocess
+
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import printer_utils
+import print_image
+import print_text
+import print_markdown
+import text_emoji
+import render_font_image
+
+from marko import Markdown
+from marko.ext.gfm import GFM
+
+FONT_CANDIDATES = ("DejaVuSans.ttf", "DejaVuSansMono.ttf", "arial.ttf", "consola.ttf")
+
+WORDS = (
+    "thermal printer raster column buffer paper feed codepage unicode emoji "
+    "table header receipt invoice total amount quantity price Zürich Gdańsk "
+    "Straße naïve café Ålesund Привет über façade"
+).split()
+
+
+# ---------------------------
+# Corpora (seeded, identical on every run)
+# ---------------------------
+
+def corpus_image(width=640, height=2000, seed=1):
+    rnd = random.Random(seed)
+    img = Image.linear_gradient("L").resize((width, height))
+    draw = ImageDraw.Draw(img)
+    for _ in range(height // 20):
+        x = rnd.randrange(width)
+        y = rnd.randrange(height)
+        r = rnd.randint(5, 80)
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=rnd.randrange(256))
+    return img.convert("RGB")
+
+
+def corpus_lines(count=2000, seed=2):
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 9))) for _ in range(count)]
+
+
+def corpus_markdown(sections=60, seed=3):
+    rnd = random.Random(seed)
+
+    def sentence():
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 16))]
+        i = rnd.randrange(len(words))
+        words[i] = rnd.choice(("**", "*")).join(["", words[i], ""])
+        return " ".join(words).capitalize() + "."
+
+    out = []
+    for n in range(sections):
+        out.append(f"# Section {n}\n")
+        out.append(" ".join(sentence() for _ in range(5)) + "\n")
+        out.append(f"## Details {n}\n")
+        out.extend(f"- {sentence()}" for _ in range(4))
+        out.append("")
+        out.extend(f"{i + 1}. {sentence()}" for i in range(3))
+        out.append("")
+        out.append("> " + sentence() + "\n")
+        out.append("```\n" + "\n".join(sentence() for _ in range(3)) + "\n```\n")
+        out.append(corpus_table(rows=5, cols=3, seed=seed + n))
+        out.append("---\n")
+    return "\n".join(out)
+
+
+def corpus_table(rows, cols, seed=4):
+    rnd = random.Random(seed)
+    header = "| " + " | ".join(f"Col {c}" for c in range(cols)) + " |"
+    align = "|" + "|".join((":---", "---:", ":---:")[c % 3] for c in range(cols)) + "|"
+    body = []
+    for _ in range(rows):
+        cells = []
+        for c in range(cols):
+            if c % 2:
+                cells.append(f"{rnd.uniform(0, 10000):.2f}")
+            else:
+                cells.append(" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 3))))
+        body.append("| " + " | ".join(cells) + " |")
+    return "\n".join([header, align] + body) + "\n"
+
+
+def corpus_emoji():
+    return [chr(c) for c in range(0x1F600, 0x1F640)]
+
+
+def digest(*parts):
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode())
+    return h.hexdigest()[:16]
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+# Each returns (run, units, unit_name, corpus_digest); run() is timed.
+
+def case_raster():
+    img = print_image.prepare_image(corpus_image())
+    return (lambda: print_image.pil_to_escpos_raster(img)), img.height, "rows", digest(img.tobytes())
+
+
+def case_image_preprocess():
+    img = corpus_image()
+    return (lambda: print_image.prepare_image(img)), img.height, "rows", digest(img.tobytes())
+
+
+def case_core_print_image(capture):
+    img = corpus_image()
+
+    def run():
+        print_image.core_print_image(img, printer=capture, use_cache=False)
+        printer_utils.flush(capture)
+    return run, img.height, "rows", digest(img.tobytes())
+
+
+def case_encode_lines(capture):
+    lines = corpus_lines()
+
+    def run():
+        for line in lines:
+            print_text.encode_and_send_line(capture, line)
+        printer_utils.flush(capture)
+    return run, len(lines), "lines", digest(*lines)
+
+
+def case_markdown_render():
+    text = corpus_markdown()
+    ast = Markdown(extensions=[GFM]).parse(text)
+
+    def run():
+        printer = print_markdown.EscPosPrinter()
+        print_markdown.AstPrinter(printer).render(ast)
+        printer_utils.flush()
+    return run, len(text.splitlines()), "md lines", digest(text)
+
+
+def case_table(rows, cols, seed):
+    text = corpus_table(rows, cols, seed)
+    ast = Markdown(extensions=[GFM]).parse(text)
+    node = next(n for n in ast.children if n.__class__.__name__ == "Table")
+
+    def run():
+        printer = print_markdown.EscPosPrinter()
+        print_markdown.AstPrinter(printer)._render_marko_table(node)
+        printer_utils.flush()
+    return run, rows, "rows", digest(text)
+
+
+def case_emoji(cached):
+    chars = corpus_emoji()
+
+    def run():
+        if not cached:
+            text_emoji.render_emoji_image.cache_clear()
+        for ch in chars:
+            text_emoji.render_emoji_image(ch)
+    if cached:
+        run()
+    return run, len(chars), "emoji", digest(*chars)
+
+
+def case_text_image(font):
+    text = "\n".join(corpus_lines(count=60, seed=5))
+    return (
+        lambda: render_font_image.create_text_image(text, font, 24, max_chars_per_line=40),
+        60, "lines", digest(text, os.path.basename(font))
+    )
+
+
+def find_font(path=None):
+    from PIL import ImageFont
+    for candidate in ([path] if path else FONT_CANDIDATES):
+        try:
+            ImageFont.truetype(candidate, 24)
+            return candidate
+        except OSError:
+            continue
+    return None
+
+
+def build_cases(capture, font):
+    cases = {
+        "pil_to_escpos_raster": lambda: case_raster(),
+        "prepare_image": lambda: case_image_preprocess(),
+        "core_print_image": lambda: case_core_print_image(capture),
+        "encode_and_send_line": lambda: case_encode_lines(capture),
+        "ast_render_large_doc": lambda: case_markdown_render(),
+        "table_wide_8x40": lambda: case_table(40, 8, 6),
+        "table_long_4x1000": lambda: case_table(1000, 4, 7),
+        "render_emoji_image_cold": lambda: case_emoji(cached=False),
+        "render_emoji_image_cached": lambda: case_emoji(cached=True),
+    }
+    if font:
+        cases["create_text_image"] = lambda: case_text_image(font)
+    return cases
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+
+def measure(run, repeat, warmup, capture):
+    for _ in range(warmup):
+        run()
+        capture.clear()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+        capture.clear()
+    return times
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\nvs {baseline_path}:")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if not old or "median_s" not in r or "median_s" not in old:
+            continue
+        if old.get("corpus") != r.get("corpus"):
+            print(f"  {name:28s} corpus changed, not comparable")
+            continue
+        ratio = r["median_s"] / old["median_s"]
+        flag = "  REGRESSION" if ratio > tolerance else ""
+        print(f"  {name:28s} {ratio:6.2f}x time{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rendering hot paths, results as JSON")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="JSON file to write")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--case", action="append", help="Only these cases (repeatable)")
+    parser.add_argument("--font", help="TTF for create_text_image (default: first of %s found)" % ", ".join(FONT_CANDIDATES))
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier JSON to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=1.15,
+                        help="Time ratio above which a case counts as a regression (default 1.15)")
+    args = parser.parse_args()
+
+    # Library chatter (escpos profile warnings, per-job INFO) is not results
+    logging.disable(logging.WARNING)
+
+    capture = printer_utils.use_capture()
+    # Default profile has no paper width; escpos prints a warning per image
+    capture.profile.profile_data["media"]["width"]["pixels"] = printer_utils.PRINTER_WIDTH_PX
+    font = find_font(args.font)
+    cases = build_cases(capture, font)
+
+    results = {}
+    if not font:
+        results["create_text_image"] = {"skipped": "no TTF font found, pass --font"}
+
+    for name, make in cases.items():
+        if args.case and name not in args.case:
+            continue
+        run, units, unit_name, corpus = make()
+        times = measure(run, args.repeat, args.warmup, capture)
+        median = statistics.median(times)
+        results[name] = {
+            "corpus": corpus,
+            "units": units,
+            "unit": unit_name,
+            "repeat": len(times),
+            "min_s": min(times),
+            "median_s": median,
+            "mean_s": statistics.fmean(times),
+            "units_per_s": units / median if median else None,
+        }
+        print(f"{name:28s} {median * 1000:9.2f} ms  {units / median:12.0f} {unit_name}/s")
+
+    printer_utils.set_backend(None)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
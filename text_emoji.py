@@ -4,8 +4,10 @@
 import sys
 import os
 import re
+import functools
 import textwrap
 import printer_utils
+import codepage_index
 from PIL import Image, ImageDraw, ImageFont
 import argparse
 
@@ -13,16 +15,10 @@ import argparse
 PRINTER_CHAR_WIDTH = 48   # columns per line
 CHAR_PIXELS = 8           # pixels per character
 EMOJI_COLUMNS = 4         # width in columns for emojis
+EMOJI_CACHE_SIZE = 512    # distinct rendered emojis kept per process
 
 # ESC/POS code pages
-CODEPAGE_CANDIDATES = [
-    (16, "cp1252", "Western Europe + €"),
-    (2, "cp850", "Western Europe"),
-    (18, "cp852", "Polish / Central Europe"),
-    (5, "cp865", "Nordic"),
-    (17, "cp866", "Cyrillic / Russian"),
-    (0, "cp437", "Box-drawing / Graphics"),
-]
+CODEPAGE_CANDIDATES = codepage_index.CODEPAGE_CANDIDATES
 
 # Emoji detection regex
 EMOJI_PATTERN = re.compile(
@@ -41,13 +37,7 @@ def get_printer(stream_mode=False):
     return printer
 
 def find_compatible_codepage(text):
-    for n, codec, desc in CODEPAGE_CANDIDATES:
-        try:
-            text.encode(codec)
-            return n, codec, desc
-        except UnicodeEncodeError:
-            continue
-    return None, None, None
+    return codepage_index.find_codepage(text)
 
 def split_text_and_emoji(line):
     result = []
@@ -62,14 +52,27 @@ def split_text_and_emoji(line):
         result.append(("text", line[idx:]))
     return result
 
+@functools.lru_cache(maxsize=None)
+def load_emoji_font(size):
+    """
+    Emoji font for a pixel size, loaded once per process.
+    The fallback is cached too, so a missing font costs one OSError.
+    """
+    try:
+        return ImageFont.truetype("seguiemj.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=EMOJI_CACHE_SIZE)
 def render_emoji_image(echar, text_width_cols=EMOJI_COLUMNS, padding=2):
+    """
+    Render one emoji to a square image. Results are memoized per
+    (character, columns, padding); callers must not modify the image.
+    """
     pixel_width = text_width_cols * CHAR_PIXELS
     img = Image.new("RGB", (pixel_width, pixel_width), "white")
     draw = ImageDraw.Draw(img)
-    try:
-        font = ImageFont.truetype("seguiemj.ttf", pixel_width)
-    except OSError:
-        font = ImageFont.load_default()
+    font = load_emoji_font(pixel_width)
 
     baseline_offset = 2
     draw.text((0, baseline_offset), echar, font=font, fill="black")
@@ -104,7 +107,7 @@ def print_text_hybrid(lines, cut=False):
                         encoded = wl.encode("ascii", errors="replace")
                         printer.text(encoded.decode("ascii") + "\n")
                     else:
-                        printer._raw(b"\x1B\x74" + bytes([n]))
+                        printer_utils.select_codepage(printer, n)
                         printer._raw(wl.encode(codec) + b"\n")
             elif kind == "emoji":
                 img = render_emoji_image(content)